@@ -0,0 +1,101 @@
+"""Benchmark the cost of log calls on the event loop.
+
+Compares handlers writing directly to a file (the previous behaviour) with
+a queue handler and a background listener, at debug and info level, and
+eager f-string formatting with lazy formatting.
+
+    python -m benchmarks.logging_dispatch --records 100000
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from queue import SimpleQueue
+from typing import Callable
+
+NAME = "living_room"
+ENTITY_ID = "light.living_room"
+
+
+def log_eager(logger: logging.Logger, index: int):
+    logger.debug(f"[{NAME}] Light {ENTITY_ID} changed by user from off to on ({index})")
+
+
+def log_lazy(logger: logging.Logger, index: int):
+    logger.debug(
+        "[%s] Light %s changed by user from %s to %s (%s)",
+        NAME,
+        ENTITY_ID,
+        "off",
+        "on",
+        index,
+    )
+
+
+def run(
+    log_file_path: Path,
+    queued: bool,
+    level: int,
+    log: Callable[[logging.Logger, int], None],
+    records: int,
+) -> float:
+    file_handler = logging.FileHandler(log_file_path)
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+    )
+    listener = None
+
+    if queued:
+        queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+        listener = QueueListener(queue, file_handler)
+        listener.start()
+        handler: logging.Handler = QueueHandler(queue)
+    else:
+        handler = file_handler
+
+    logger = logging.getLogger("benchmark")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(level)
+
+    start = time.perf_counter()
+
+    for index in range(records):
+        log(logger, index)
+
+    elapsed = time.perf_counter() - start
+
+    if listener is not None:
+        listener.stop()
+
+    file_handler.close()
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_file_path = Path(directory) / "benchmark.log"
+
+        for name, queued, level, log in (
+            ("direct, debug", False, logging.DEBUG, log_lazy),
+            ("queued, debug", True, logging.DEBUG, log_lazy),
+            ("eager, info", True, logging.INFO, log_eager),
+            ("lazy, info", True, logging.INFO, log_lazy),
+        ):
+            elapsed = run(log_file_path, queued, level, log, args.records)
+            print(
+                f"{name:>14}: {args.records / elapsed:>12,.0f} records/s "
+                f"{elapsed / args.records * 1e6:>8.2f} us/call"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark the overhead of polling /status from the custom component.
+
+Compares a new session per poll (the previous behaviour), a shared
+session, and a shared session with conditional requests.
+
+    python -m benchmarks.status_polling --polls 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+import aiohttp
+import uvicorn
+from fastapi import FastAPI
+
+from home_automations.helper.circuit_breaker import CircuitBreakers
+from home_automations.helper.client import HomeAssistantClient
+from home_automations.helper.handler import HandlerStats
+from home_automations.helper.loop_monitor import LoopMonitor
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.startup import Startup
+from home_automations.helper.tracing import Tracer
+from home_automations.home_automations_api import HomeAutomationsApi
+from home_automations.models.config import Config
+from home_automations.models.homeassistant_config import HomeAssistantConfig
+from home_automations.models.tibber_config import TibberConfig
+
+
+def create_app() -> FastAPI:
+    config = Config(
+        timezone="Europe/Berlin",
+        homeassistant=HomeAssistantConfig(url="ws://localhost", token="token"),
+        tibber=TibberConfig(token="token", home_id="home_id"),
+    )
+    config.config_file_path = Path("config.yml")
+
+    fastapi = FastAPI()
+    metrics = Metrics()
+    tracer = Tracer(config.monitoring.trace_buffer_size)
+    HomeAutomationsApi(
+        fastapi,
+        Startup(),
+        HomeAssistantClient(config, metrics, tracer),
+        metrics,
+        HandlerStats(metrics, config.monitoring.slow_handler_threshold),
+        LoopMonitor(
+            metrics,
+            config.monitoring.loop_lag_interval,
+            config.monitoring.loop_lag_threshold,
+        ),
+        tracer,
+        CircuitBreakers(config.breaker, metrics, lambda exception: None),
+    )
+
+    return fastapi
+
+
+async def poll_new_session(url: str) -> int:
+    async with aiohttp.ClientSession() as session, session.get(url) as response:
+        return len(await response.read())
+
+
+async def poll_shared_session(session: aiohttp.ClientSession, url: str) -> int:
+    async with session.get(url) as response:
+        return len(await response.read())
+
+
+async def poll_conditional(
+    session: aiohttp.ClientSession, url: str, etags: dict[str, str]
+) -> int:
+    headers = {"If-None-Match": etags[url]} if url in etags else {}
+
+    async with session.get(url, headers=headers) as response:
+        if "ETag" in response.headers:
+            etags[url] = response.headers["ETag"]
+
+        return len(await response.read())
+
+
+async def measure(name: str, polls: int, poll) -> None:
+    durations: list[float] = []
+    received = 0
+
+    for _ in range(polls):
+        start = time.perf_counter()
+        received += await poll()
+        durations.append(time.perf_counter() - start)
+
+    durations.sort()
+
+    print(
+        f"{name:<20} "
+        f"mean {statistics.mean(durations) * 1000:7.3f} ms  "
+        f"p50 {durations[len(durations) // 2] * 1000:7.3f} ms  "
+        f"p99 {durations[int(len(durations) * 0.99)] * 1000:7.3f} ms  "
+        f"body {received / polls:6.1f} B/poll"
+    )
+
+
+async def run(polls: int, port: int) -> None:
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning")
+    )
+    server_task = asyncio.create_task(server.serve())
+
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    url = f"http://127.0.0.1:{port}/status"
+
+    try:
+        await measure("new session", polls, lambda: poll_new_session(url))
+
+        async with aiohttp.ClientSession() as session:
+            await measure(
+                "shared session", polls, lambda: poll_shared_session(session, url)
+            )
+
+            etags: dict[str, str] = {}
+            await measure(
+                "conditional", polls, lambda: poll_conditional(session, url, etags)
+            )
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.polls, args.port))
+
+
+if __name__ == "__main__":
+    main()
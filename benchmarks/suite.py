@@ -0,0 +1,400 @@
+"""Benchmark the hot paths of event dispatch, schedules and module decisions.
+
+Every benchmark is compared to the baseline stored for it, and the run
+fails if one got slower than the threshold allows. The reference baselines
+in benchmarks/baselines.json show the expected order of magnitude, but
+timings depend on the machine. To check a change for regressions, store
+baselines of your machine before making it and compare against those:
+
+    python -m benchmarks.suite --baselines benchmarks/baselines.local.json --save
+    python -m benchmarks.suite --baselines benchmarks/baselines.local.json
+
+Update the reference baselines with `--save` when a change makes a hot path
+faster or slower on purpose.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from hass_client.models import Event
+
+from home_automations.helper.client import HomeAssistantClient
+from home_automations.helper.clock import Clock
+from home_automations.helper.day_state import DayStateResolver
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.tracing import Tracer
+from home_automations.models.climate_config import ClimateConfig
+from home_automations.models.config import Config
+from home_automations.models.homeassistant_config import HomeAssistantConfig
+from home_automations.models.motion_light_config import (
+    ElevationMotionLightState,
+    ExtraMotionLightState,
+    MotionLightConfig,
+    MotionLightState,
+    TimeMotionLightState,
+)
+from home_automations.models.thermostat_config import ThermostatConfig
+from home_automations.models.tibber_config import TibberConfig
+from home_automations.modules.base_module import BaseModule
+from home_automations.modules.thermostat_module import ThermostatModule
+from home_automations.testing.fake_client import FakeHassClient
+from home_automations.testing.fake_homeassistant import create_state
+from home_automations.testing.harness import (
+    connect_without_clock,
+    create_home_automations,
+)
+
+DEFAULT_BASELINES_PATH = Path(__file__).parent / "baselines.json"
+DEFAULT_THRESHOLD = 0.2
+ROUNDS = 5
+MIN_ROUND_TIME = 0.05
+
+Benchmark = Callable[[Path], AsyncIterator[Callable[[], Awaitable[Any]]]]
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """Register a benchmark.
+
+    A benchmark is an async generator that sets up its subject, yields the
+    coroutine function to time and cleans up afterwards.
+    """
+
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+def create_config(**kwargs: Any) -> Config:
+    config = Config(
+        timezone="Europe/Berlin",
+        homeassistant=HomeAssistantConfig(url="ws://localhost", token="token"),
+        tibber=TibberConfig(token="token", home_id="home_id"),
+        **kwargs,
+    )
+    config.config_file_path = Path("config.yml")
+
+    return config
+
+
+def create_state_changed_event(
+    old_state: dict[str, Any], new_state: dict[str, Any]
+) -> Event:
+    return Event(
+        event_type="state_changed",
+        data={
+            "entity_id": new_state["entity_id"],
+            "old_state": old_state,
+            "new_state": new_state,
+        },
+        origin="LOCAL",
+        time_fired=new_state["last_updated"],
+        context=new_state["context"],
+    )
+
+
+def create_motion_light_config(index: int) -> MotionLightConfig:
+    return MotionLightConfig(
+        name=f"room_{index}",
+        default_state=MotionLightState(scene=f"scene.room_{index}_bright"),
+        light_on_entities=[f"light.room_{index}"],
+        motion_entities=[f"binary_sensor.room_{index}_motion"],
+        states=[
+            ExtraMotionLightState(
+                scene=f"scene.room_{index}_night",
+                time_state=TimeMotionLightState(_time_from="23:00", _time_to="06:00"),
+            ),
+            ExtraMotionLightState(
+                scene=f"scene.room_{index}_evening",
+                elevation_state=ElevationMotionLightState(elevation=-4),
+            ),
+        ],
+    )
+
+
+def create_motion_light_states(index: int) -> list[dict[str, Any]]:
+    return [
+        create_state(f"light.room_{index}", "off"),
+        create_state(f"binary_sensor.room_{index}_motion", "off"),
+    ]
+
+
+def dispatch_benchmark(modules: int) -> Benchmark:
+    async def dispatch(state_directory: Path):
+        """Dispatch motion events to the last of many motion light modules."""
+
+        states = [create_state("sun.sun", "above_horizon", {"elevation": 20.0})]
+        for index in range(modules):
+            states += create_motion_light_states(index)
+
+        fake_client = FakeHassClient(states)
+        home_automations = create_home_automations(
+            create_config(
+                motion_light_configs=[
+                    create_motion_light_config(index) for index in range(modules)
+                ]
+            ),
+            fake_client,
+            state_directory,
+        )
+        await connect_without_clock(home_automations)
+
+        entity_id = f"binary_sensor.room_{modules - 1}_motion"
+        off_state = create_state(entity_id, "off")
+        on_state = create_state(entity_id, "on")
+        events = [
+            create_state_changed_event(off_state, on_state),
+            create_state_changed_event(on_state, off_state),
+        ]
+        count = 0
+
+        async def run():
+            nonlocal count
+            count += 1
+            await home_automations.on_event(events[count % 2])
+
+        yield run
+
+        await home_automations.tools.client.disconnect()
+
+    return dispatch
+
+
+for module_count in (10, 100, 1000):
+    benchmark(f"on_event[{module_count} modules]")(dispatch_benchmark(module_count))
+
+
+@benchmark("on_state_changed")
+async def on_state_changed(state_directory: Path):
+    """Parse a state changed event and call a module callback."""
+
+    home_automations = create_home_automations(
+        create_config(), FakeHassClient(), state_directory
+    )
+
+    class NoopModule(BaseModule):
+        async def on_changed(self, event: Event, old_state: Any, new_state: Any):
+            pass
+
+    module = NoopModule(home_automations.config, home_automations.tools)
+    module.register_state_changed(module.on_changed, "sensor.power")
+    event = create_state_changed_event(
+        create_state("sensor.power", "100", {"unit_of_measurement": "W"}),
+        create_state("sensor.power", "120", {"unit_of_measurement": "W"}),
+    )
+
+    yield lambda: module.on_state_changed(event)
+
+
+@benchmark("_get_schedule_key")
+async def get_schedule_key(state_directory: Path):
+    """Resolve the active key of a schedule."""
+
+    clock = Clock(create_config())
+    schedule = {
+        "00:00": 18.0,
+        "06:00": 20.0,
+        "08:30": 19.0,
+        "12:00": 20.0,
+        "17:00": 21.0,
+        "22:30": 18.0,
+    }
+
+    async def run():
+        clock._get_schedule_key(schedule)
+
+    yield run
+
+
+@benchmark("DayStateResolver.resolve")
+async def resolve_day_state(state_directory: Path):
+    """Resolve the scene of a motion light with time and elevation states."""
+
+    config = create_config()
+    fake_client = FakeHassClient(
+        [create_state("sun.sun", "above_horizon", {"elevation": 20.0})]
+    )
+    client = HomeAssistantClient(config, Metrics(), Tracer(1), fake_client)
+    await client.connect()
+    await client.resync()
+
+    resolver = DayStateResolver(Clock(config), client)
+    motion_light_config = create_motion_light_config(0)
+
+    yield lambda: resolver.resolve(motion_light_config)
+
+    await client.disconnect()
+
+
+@benchmark("ThermostatModule.on_second_changed")
+async def thermostat_on_second_changed(state_directory: Path):
+    """Compute and apply the target of a thermostat."""
+
+    climate_config = ClimateConfig(
+        thermostat_configs=[
+            ThermostatConfig(
+                climate_entity="climate.living_room",
+                temperature_entity="sensor.living_room_temperature",
+                window_entities=["binary_sensor.living_room_window"],
+            )
+        ],
+        schedule={"00:00": 18.0, "06:00": 20.5, "22:00": 18.0},
+        climate_control_entity="input_select.climate_control",
+    )
+    fake_client = FakeHassClient(
+        [
+            create_state(
+                "climate.living_room",
+                "heat",
+                {"temperature": 21.0, "current_temperature": 19.0},
+            ),
+            create_state("sensor.living_room_temperature", "19.5"),
+            create_state("binary_sensor.living_room_window", "off"),
+            create_state("input_select.climate_control", "auto"),
+        ]
+    )
+    home_automations = create_home_automations(
+        create_config(climate_configs=[climate_config]), fake_client, state_directory
+    )
+    await connect_without_clock(home_automations)
+
+    module = next(
+        module
+        for module in home_automations.modules
+        if isinstance(module, ThermostatModule)
+    )
+
+    yield lambda: module.on_second_changed(0)
+
+    await home_automations.tools.client.disconnect()
+
+
+@benchmark("HomeAssistantClient.call_service")
+async def call_service(state_directory: Path):
+    """Call a service through the client against the in-process fake."""
+
+    fake_client = FakeHassClient()
+    client = HomeAssistantClient(create_config(), Metrics(), Tracer(1), fake_client)
+    await client.connect()
+
+    async def run():
+        await client.call_service(
+            "light",
+            "turn_on",
+            service_data={"brightness_pct": 80},
+            target={"entity_id": "light.living_room"},
+        )
+        fake_client.service_calls.clear()
+
+    yield run
+
+    await client.disconnect()
+
+
+async def measure(run: Callable[[], Awaitable[Any]]) -> float:
+    """Return the best time per call over a few rounds, in seconds.
+
+    The calibration round doubles as warm-up and is not counted.
+    """
+
+    number = 1
+
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            await run()
+
+        if time.perf_counter() - start >= MIN_ROUND_TIME:
+            break
+
+        number *= 2
+
+    best = float("inf")
+
+    for _ in range(ROUNDS):
+        # Let the tasks started by the calls run between rounds.
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        for _ in range(number):
+            await run()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    return best
+
+
+async def run_benchmarks(names: list[str]) -> dict[str, float]:
+    results = {}
+
+    for name in names:
+        with tempfile.TemporaryDirectory() as state_directory:
+            generator = BENCHMARKS[name](Path(state_directory))
+            run = await anext(generator)
+            results[name] = await measure(run)
+            await anext(generator, None)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*", help="benchmarks to run, default all")
+    parser.add_argument("--baselines", type=Path, default=DEFAULT_BASELINES_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown relative to the baseline",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the baselines"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"Unknown benchmark {name}, choose from {list(BENCHMARKS)}")
+
+    results = asyncio.run(run_benchmarks(args.names or list(BENCHMARKS)))
+    baselines: dict[str, float] = (
+        json.loads(args.baselines.read_text()) if args.baselines.exists() else {}
+    )
+    regressions = []
+
+    for name, result in results.items():
+        line = f"{name:<40} {result * 1e6:>10.2f} us"
+        baseline = baselines.get(name)
+
+        if baseline is not None:
+            change = result / baseline - 1
+            line += f" {change:>+8.1%}"
+
+            if change > args.threshold:
+                regressions.append(name)
+                line += " REGRESSION"
+
+        print(line)
+
+    if args.save:
+        args.baselines.write_text(
+            json.dumps({**baselines, **results}, indent=2, sort_keys=True) + "\n"
+        )
+        print(f"Saved baselines to {args.baselines}")
+    elif regressions:
+        print(f"{len(regressions)} benchmarks slower than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from homeassistant.const import CONF_URL, Platform
 from homeassistant.core import HomeAssistant
 
 from .client import Client
-from .const import DOMAIN
+from .const import CONF_PUSH, DOMAIN
 from .coordinator import Coordinator
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SWITCH]
@@ -19,7 +19,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     url = entry.data[CONF_URL]
 
     client = Client(hass, _LOGGER, url)
-    coordinator = Coordinator(hass, _LOGGER, client)
+    coordinator = Coordinator(
+        hass, _LOGGER, client, push=entry.options.get(CONF_PUSH, True)
+    )
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[entry.entry_id] = {
@@ -29,6 +31,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await coordinator.async_config_entry_first_refresh()
 
+    coordinator.async_start_push()
+    entry.async_on_unload(coordinator.async_stop_push)
+
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
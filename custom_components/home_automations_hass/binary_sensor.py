@@ -1,16 +1,16 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.util.dt import get_time_zone
+from homeassistant.helpers.event import async_track_time_interval
 
 from .base_entity import BaseEntity
 from .client import Client
@@ -24,6 +24,7 @@ from .const import (
     CONF_WASHING_MACHINE_MODEL,
     CONF_WASHING_MACHINE_SHELLY_ENTITY_ID,
     DOMAIN,
+    STATE_MONITORING_CHECK_INTERVAL,
 )
 from .coordinator import Coordinator
 
@@ -76,6 +77,27 @@ class StateMonitoringSensor(BaseEntity, BinarySensorEntity):
         self._attr_device_class = BinarySensorDeviceClass.RUNNING
         self._attr_name = "State Monitoring"
 
+    async def async_added_to_hass(self) -> None:
+        """Re-check the last state change periodically.
+
+        In push mode the coordinator only updates when the status changes, so
+        a status that stopped changing would never turn the sensor off.
+        """
+
+        await super().async_added_to_hass()
+
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass,
+                self._async_check_state_monitoring,
+                timedelta(seconds=STATE_MONITORING_CHECK_INTERVAL),
+            )
+        )
+
+    @callback
+    def _async_check_state_monitoring(self, now: datetime) -> None:
+        self.async_write_ha_state()
+
     @property
     def is_on(self) -> bool:
         """Return true if the binary sensor is on."""
@@ -84,7 +106,7 @@ class StateMonitoringSensor(BaseEntity, BinarySensorEntity):
             return False
 
         last_state_changed = self._coordinator.status.last_state_changed
-        now = datetime.now(get_time_zone(self.hass.config.time_zone))
+        now = datetime.now(self._client.tzinfo)
 
         seconds_since_last_state_change = (now - last_state_changed).total_seconds()
 
@@ -1,14 +1,19 @@
 """Client."""
 
 import datetime
+import json
 from logging import Logger
+from typing import Any, AsyncIterator
 
 import aiohttp
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.util.dt import get_time_zone
 
 from home_automations.models.status import Status
 
+from .const import REQUEST_TIMEOUT, STREAM_READ_TIMEOUT
+
 
 class Client:
     """Client."""
@@ -19,26 +24,73 @@ class Client:
         self._hass = hass
         self._url = url
         self._logger = logger
+        self._session = async_get_clientsession(hass)
+        self._etag: str | None = None
+        self._status: Status | None = None
+        self._time_zone: str | None = None
+        self._tzinfo: datetime.tzinfo | None = None
+
+    @property
+    def tzinfo(self) -> datetime.tzinfo | None:
+        """Return the time zone of Home Assistant, cached until it changes."""
+
+        if self._time_zone != self._hass.config.time_zone:
+            self._time_zone = self._hass.config.time_zone
+            self._tzinfo = get_time_zone(self._time_zone)
+
+        return self._tzinfo
+
+    def _parse_status(self, data: dict[str, Any]) -> Status:
+        last_state_changed_str: str = data["last_state_changed"]
+        last_state_changed: datetime.datetime = datetime.datetime.fromisoformat(
+            last_state_changed_str
+        )
+        last_state_changed = last_state_changed.replace(tzinfo=self.tzinfo)
+
+        return Status(last_state_changed=last_state_changed)
 
     async def async_get_status(self) -> Status | None:
-        """GET /status."""
+        """GET /status, returning the cached status if it is unchanged."""
+
+        headers = {"If-None-Match": self._etag} if self._etag is not None else {}
 
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(10)
-            ) as session, session.get(f"{self._url}/status") as response:
+            async with self._session.get(
+                f"{self._url}/status",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(REQUEST_TIMEOUT),
+            ) as response:
+                if response.status == 304:
+                    return self._status
+
                 if response.status != 200:
+                    self._etag = None
                     return None
 
                 data = await response.json()
-                last_state_changed_str: str = data["last_state_changed"]
-                last_state_changed: datetime.datetime = datetime.datetime.fromisoformat(
-                    last_state_changed_str
-                )
-                tzinfo = get_time_zone(self._hass.config.time_zone)
-                last_state_changed = last_state_changed.replace(tzinfo=tzinfo)
-
-                return Status(last_state_changed=last_state_changed)
+
+                self._status = self._parse_status(data)
+                self._etag = response.headers.get("ETag")
+
+                return self._status
         except TimeoutError:
             self._logger.error("Timeout")
             return None
+
+    async def async_stream_status(self) -> AsyncIterator[Status]:
+        """GET /status/stream, yielding every pushed status."""
+
+        async with self._session.get(
+            f"{self._url}/status/stream",
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=STREAM_READ_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+
+            async for line in response.content:
+                if not line.startswith(b"data:"):
+                    continue
+
+                self._status = self._parse_status(json.loads(line[5:]))
+                self._etag = None
+
+                yield self._status
@@ -11,6 +11,7 @@ from .const import (
     CONF_DRYER_MANUFACTURER,
     CONF_DRYER_MODEL,
     CONF_DRYER_SHELLY_ENTITY_ID,
+    CONF_PUSH,
     CONF_WASHING_MACHINE_MAC,
     CONF_WASHING_MACHINE_MANUFACTURER,
     CONF_WASHING_MACHINE_MODEL,
@@ -119,6 +120,10 @@ class OptionsFlowHandler(OptionsFlow):
                         CONF_DRYER_MODEL,
                         default=self.config_entry.options.get(CONF_DRYER_MODEL, ""),
                     ): str,
+                    vol.Required(
+                        CONF_PUSH,
+                        default=self.config_entry.options.get(CONF_PUSH, True),
+                    ): bool,
                 }
             ),
         )
@@ -1,5 +1,13 @@
 DOMAIN = "home_automations_hass"
 
+CONF_PUSH = "push"
+
+UPDATE_INTERVAL = 10
+REQUEST_TIMEOUT = 10
+STREAM_READ_TIMEOUT = 60
+STREAM_RETRY_INTERVAL = 30
+STATE_MONITORING_CHECK_INTERVAL = 5
+
 CONF_WASHING_MACHINE_SHELLY_ENTITY_ID = "washing_machine_shelly_entity_id"
 CONF_WASHING_MACHINE_MAC = "washing_machine_mac"
 CONF_WASHING_MACHINE_MANUFACTURER = "washing_machine_manufacturer"
@@ -1,28 +1,37 @@
+import asyncio
 from datetime import timedelta
 from logging import Logger
 
+import aiohttp
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from home_automations.models.status import Status
 
 from .client import Client
+from .const import STREAM_RETRY_INTERVAL, UPDATE_INTERVAL
 
 
 class Coordinator(DataUpdateCoordinator):
-    """Coordinator."""
+    """Coordinator.
 
-    def __init__(self, hass: HomeAssistant, logger: Logger, client: Client):
+    In push mode the status is streamed from Home Automations and polling is
+    only used as a fallback while the stream is unavailable.
+    """
+
+    def __init__(self, hass: HomeAssistant, logger: Logger, client: Client, push: bool):
         super().__init__(
             hass,
             logger,
-            update_interval=timedelta(seconds=10),
+            update_interval=timedelta(seconds=UPDATE_INTERVAL),
             update_method=self.update,
             name="Home Automations",
         )
 
         self._client = client
         self._status: Status | None = None
+        self._push = push
+        self._stream_task: asyncio.Task | None = None
 
     @property
     def status(self) -> Status | None:
@@ -34,3 +43,42 @@ class Coordinator(DataUpdateCoordinator):
         """Update data."""
 
         self._status = await self._client.async_get_status()
+
+    def async_start_push(self) -> None:
+        """Start consuming the status stream."""
+
+        if not self._push or self._stream_task is not None:
+            return
+
+        self._stream_task = self.hass.async_create_background_task(
+            self._async_stream(), name="Home Automations status stream"
+        )
+
+    def async_stop_push(self) -> None:
+        """Stop consuming the status stream."""
+
+        if self._stream_task is None:
+            return
+
+        self._stream_task.cancel()
+        self._stream_task = None
+
+    async def _async_stream(self) -> None:
+        while True:
+            try:
+                async for status in self._client.async_stream_status():
+                    if self.update_interval is not None:
+                        self.logger.debug("Status stream connected, stop polling")
+                        self.update_interval = None
+
+                    self._status = status
+                    self.async_set_updated_data(None)
+            except (aiohttp.ClientError, TimeoutError, ValueError) as ex:
+                self.logger.debug("Status stream failed: %s", ex)
+
+            if self.update_interval is None:
+                self.logger.debug("Status stream lost, falling back to polling")
+                self.update_interval = timedelta(seconds=UPDATE_INTERVAL)
+                await self.async_request_refresh()
+
+            await asyncio.sleep(STREAM_RETRY_INTERVAL)
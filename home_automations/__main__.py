@@ -24,6 +24,8 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await home_automations.stop()
+
 
 fastapi = FastAPI(lifespan=lifespan)
 
@@ -1,4 +1,4 @@
-from enum import Enum, StrEnum
+from enum import Enum, IntEnum, StrEnum
 
 ENV_CONFIG_FILE_PATH = "CONFIG_FILE_PATH"
 DEFAULT_CONFIG_FILE_PATH = "config.yml"
@@ -10,21 +10,75 @@ DEFAULT_LOGGING_PATH = "home_automations.log"
 DEFAULT_LOGGING_FMT = "%(asctime)s %(levelname)s %(message)s"
 DEFAULT_LOGGING_DATEFMT = "%Y-%m-%d %H:%M:%S"
 DEFAULT_LOGGING_FILEMODE = "a"
+DEFAULT_LOGGING_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOGGING_BACKUP_COUNT = 5
 
 DEFAULT_TZ = "Europe/Berlin"
 
+CLOCK_TICK_INTERVAL = 0.25
+
+DEFAULT_SLOW_HANDLER_THRESHOLD = 0.5
+DEFAULT_LOOP_LAG_INTERVAL = 0.5
+DEFAULT_LOOP_LAG_THRESHOLD = 0.25
+DEFAULT_TRACE_BUFFER_SIZE = 500
+DEFAULT_PROFILING = False
+PROFILE_MAX_DURATION = 60
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+DEFAULT_PERSISTENCE_PATH = "home_automations.state.json"
+DEFAULT_PERSISTENCE_INTERVAL = 60
+
+DEFAULT_RECORDING_PATH = "home_automations.events.jsonl.gz"
+DEFAULT_RECORDING_INTERVAL = 10
+
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_BREAKER_MIN_COOLDOWN = 30.0
+DEFAULT_BREAKER_MAX_COOLDOWN = 3600.0
+
+DEFAULT_MAX_CONCURRENT_HANDLERS = 4
+DEFAULT_MAX_PRIORITY_WAIT = 5.0
+DEFAULT_HANDLER_TIMEOUT = 30.0
+HANDLER_TIMEOUT_CHECK_INTERVAL = 0.25
+
 DEFAULT_MAX_THERMOSTAT_TEMP = 29.5
 DEFAULT_MIN_THERMOSTAT_TEMP = 4.5
 DEFAULT_MAX_EFFECTIVE_THERMOSTAT_TEMP = 29.0
 DEFAULT_MIN_EFFECTIVE_THERMOSTAT_TEMP = 17.5
 DEFAULT_MAX_TARGET_DIFF = 4.5
+THERMOSTAT_COALESCE_WINDOW = 1.0
 
 DEFAULT_TIBBER_UPDATE_INTERVAL = 60
 
+DEFAULT_RECONNECT_MIN_DELAY = 1.0
+DEFAULT_RECONNECT_MAX_DELAY = 60.0
+DEFAULT_PING_INTERVAL = 30.0
+DEFAULT_PING_TIMEOUT = 10.0
+DEFAULT_MAX_LATENCY = 2.0
+DEFAULT_MAX_SLOW_PINGS = 3
+DEFAULT_UNKNOWN_ENTITY_TTL = 300.0
+DEFAULT_SERVICE_CALL_TIMEOUT = 10.0
+DEFAULT_GET_STATE_TIMEOUT = 5.0
+DEFAULT_SERVICE_BREAKER_WINDOW = 20
+DEFAULT_SERVICE_BREAKER_FAILURE_RATE = 0.5
+DEFAULT_SERVICE_BREAKER_MIN_COOLDOWN = 5.0
+DEFAULT_SERVICE_BREAKER_MAX_COOLDOWN = 120.0
+SERVICE_BREAKER_MIN_CALLS = 5
+DEFAULT_OWN_CONTEXT_TTL = 60.0
+OWN_CONTEXTS_MAX_SIZE = 1000
+OWN_CONTEXT_WAIT = 0.5
+
+STATUS_STREAM_KEEPALIVE_INTERVAL = 15
+
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 5000
 
 
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
 class ThermostatState(str, Enum):
     OFF = "off"
     HEAT = "heat"
@@ -0,0 +1,305 @@
+import logging
+import time
+from collections import deque
+from enum import StrEnum
+from typing import Any, Callable
+
+from hass_client.exceptions import CannotConnect, ConnectionFailed, NotConnected
+
+from home_automations.const import SERVICE_BREAKER_MIN_CALLS
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.reconnect import Backoff
+from home_automations.models.breaker_config import BreakerConfig
+from home_automations.models.exceptions import (
+    RequestTimeoutError,
+    ServiceTimeoutError,
+    ServiceUnavailableError,
+)
+
+# Failures that are not caused by the callback itself: Home Assistant is
+# not connected or does not answer, or a service was deliberately not
+# called again.
+EXPECTED_EXCEPTIONS: tuple[type[Exception], ...] = (
+    NotConnected,
+    CannotConnect,
+    ConnectionFailed,
+    RequestTimeoutError,
+    ServiceTimeoutError,
+    ServiceUnavailableError,
+)
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop calling something that keeps failing.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    calls are skipped until the cooldown has passed. Then a single trial
+    call is let through: if it succeeds the breaker closes, otherwise it
+    opens again with the next, longer cooldown of the backoff.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        backoff: Backoff,
+        now: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.now = now
+        self.consecutive_failures: int = 0
+        self.failures: int = 0
+        self.trips: int = 0
+        self.skipped: int = 0
+        self.last_error: str | None = None
+        self.open_until: float | None = None
+        self.trial: bool = False
+
+    @property
+    def state(self) -> BreakerState:
+        if self.open_until is None:
+            return BreakerState.CLOSED
+
+        if self.now() < self.open_until:
+            return BreakerState.OPEN
+
+        return BreakerState.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Return whether a call may be made now."""
+
+        if self.open_until is None:
+            return True
+
+        if self.state == BreakerState.HALF_OPEN and not self.trial:
+            self.trial = True
+            return True
+
+        self.skipped += 1
+
+        return False
+
+    def release(self):
+        """Let another trial call through after one ended without a result."""
+
+        self.trial = False
+
+    def record_success(self) -> bool:
+        """Record a successful call and return whether the breaker closed."""
+
+        if self.open_until is None and not self.consecutive_failures:
+            return False
+
+        self.consecutive_failures = 0
+        self.trial = False
+
+        if self.open_until is None:
+            return False
+
+        logging.info("Re-enabled %s", self.name)
+        self.open_until = None
+        self.backoff.reset()
+
+        return True
+
+    def record_failure(self, exception: Exception) -> bool:
+        """Record a failed call and return whether the breaker opened."""
+
+        trial = self.trial
+        self.trial = False
+
+        if isinstance(exception, EXPECTED_EXCEPTIONS):
+            return False
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = f"{type(exception).__name__}: {exception}"
+
+        if not trial and self.consecutive_failures < self.failure_threshold:
+            return False
+
+        self.open(f"{self.consecutive_failures} consecutive failures")
+
+        return True
+
+    def open(self, reason: str):
+        cooldown = self.backoff.next_delay()
+        self.open_until = self.now() + cooldown
+        self.trips += 1
+        logging.warning(
+            "Disabled %s for %.1fs after %s, last: %s",
+            self.name,
+            cooldown,
+            reason,
+            self.last_error,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "skipped": self.skipped,
+            "reopens_in": (
+                max(0.0, self.open_until - self.now())
+                if self.open_until is not None
+                else None
+            ),
+            "last_error": self.last_error,
+        }
+
+
+class ServiceCallBreaker(CircuitBreaker):
+    """Stop calling services while Home Assistant is unhealthy.
+
+    Opens when at least `failure_rate` of the last `window` service calls
+    failed or were slow. Calls that end while the breaker is open do not
+    open it again, a successful one closes it.
+    """
+
+    def __init__(
+        self,
+        window: int,
+        failure_rate: float,
+        backoff: Backoff,
+        now: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__("service calls", window, backoff, now)
+        self.failure_rate = failure_rate
+        self.outcomes: deque[bool] = deque(maxlen=window)
+
+    @property
+    def current_failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def record_success(self) -> bool:
+        self.outcomes.append(False)
+
+        if not super().record_success():
+            return False
+
+        self.outcomes.clear()
+
+        return True
+
+    def record_failure(self, exception: Exception) -> bool:
+        trial = self.trial
+        self.trial = False
+        self.outcomes.append(True)
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = f"{type(exception).__name__}: {exception}"
+
+        if self.open_until is not None and not trial:
+            return False
+
+        if not trial and (
+            len(self.outcomes) < SERVICE_BREAKER_MIN_CALLS
+            or self.current_failure_rate < self.failure_rate
+        ):
+            return False
+
+        self.open(f"{self.current_failure_rate:.0%} failed or slow calls")
+
+        return True
+
+    def reset(self):
+        """Close the breaker, e.g. after reconnecting to Home Assistant."""
+
+        self.outcomes.clear()
+        self.consecutive_failures = 0
+        self.trial = False
+        self.open_until = None
+        self.backoff.reset()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "failure_rate": self.current_failure_rate,
+        }
+
+
+class CircuitBreakers:
+    """Circuit breakers of all module callbacks.
+
+    A callback that fails is skipped after repeated failures, so a broken
+    config or entity does not slow down the other modules. The exceptions
+    are passed on to `on_exception`.
+    """
+
+    def __init__(
+        self,
+        config: BreakerConfig,
+        metrics: Metrics,
+        on_exception: Callable[[Exception], None],
+        now: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config
+        self.on_exception = on_exception
+        self.now = now
+        self.breakers: dict[tuple[str, str], CircuitBreaker] = {}
+        self.trips = metrics.counter(
+            "breaker_trips_total",
+            "Module callbacks disabled after repeated failures.",
+            ("module", "callback"),
+        )
+        metrics.gauge(
+            "open_breakers",
+            "Module callbacks that are currently disabled.",
+            lambda: {(): len(self.open())},
+        )
+
+    def get(self, module: str, callback: str) -> CircuitBreaker:
+        """Return the breaker of a callback."""
+
+        breaker = self.breakers.get((module, callback))
+
+        if breaker is None:
+            breaker = self.breakers[(module, callback)] = CircuitBreaker(
+                f"{module}.{callback}",
+                self.config.failure_threshold,
+                Backoff(self.config.min_cooldown, self.config.max_cooldown),
+                self.now,
+            )
+
+        return breaker
+
+    def record_failure(self, module: str, callback: str, exception: Exception):
+        if self.get(module, callback).record_failure(exception):
+            self.trips.inc(module, callback)
+
+        self.on_exception(exception)
+
+    def open(self) -> list[CircuitBreaker]:
+        return [
+            breaker
+            for breaker in self.breakers.values()
+            if breaker.state != BreakerState.CLOSED
+        ]
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the breakers of all callbacks that failed, open ones first."""
+
+        return sorted(
+            (
+                {"module": module, "callback": callback, **breaker.as_dict()}
+                for (module, callback), breaker in self.breakers.items()
+                if breaker.failures
+            ),
+            key=lambda breaker: (
+                breaker["state"] == BreakerState.CLOSED,
+                -breaker["failures"],
+            ),
+        )
@@ -1,37 +1,145 @@
 import asyncio
 import datetime
 import logging
-from typing import Any, Callable
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
 
 import aiohttp
 from hass_client import HomeAssistantClient as HassClient
 from hass_client.exceptions import (
-    AuthenticationFailed,
-    CannotConnect,
     ConnectionFailed,
+    FailedCommand,
     NotConnected,
     NotFoundError,
 )
-from hass_client.models import State
+from hass_client.models import Event, State
 
+from home_automations.const import OWN_CONTEXT_WAIT, OWN_CONTEXTS_MAX_SIZE
+from home_automations.helper import hass_client_adapter
+from home_automations.helper.circuit_breaker import BreakerState, ServiceCallBreaker
+from home_automations.helper.events import create_event, get_context, get_context_id
+from home_automations.helper.metrics import HistogramFamily, Metrics
+from home_automations.helper.negative_cache import NegativeCache
+from home_automations.helper.own_contexts import OwnContexts
+from home_automations.helper.reconnect import Backoff, ReconnectManager
+from home_automations.helper.tracing import Tracer, span
 from home_automations.models.config import Config
-from home_automations.models.exceptions import NotFoundAgainError, ServiceTimeoutError
+from home_automations.models.exceptions import (
+    NotFoundAgainError,
+    RequestTimeoutError,
+    ServiceTimeoutError,
+    ServiceUnavailableError,
+)
+
+# Services that set the same on/off state, so only the latest call to one
+# of them is kept for an entity while service calls are deferred.
+STATE_SERVICES = {"turn_on", "turn_off"}
+
+# Services whose effect depends on the state when they are called, so they
+# cannot be deferred and merged like the others.
+NON_DEFERRABLE_SERVICES = {"toggle"}
 
 
 class HomeAssistantClient:
     config: Config
     session: aiohttp.ClientSession
     client: HassClient
-    unknown_entities: set[str] = set()
+    unknown_entities: NegativeCache
+    own_contexts: OwnContexts
     called_services: dict[int, datetime.datetime]
     on_connection_callbacks: list[Callable]
+    on_event_callbacks: list[Callable]
+    states: dict[str, dict[str, Any]]
+    reconnect_manager: ReconnectManager
+    command_latency: HistogramFamily
+    tracer: Tracer
+    service_breaker: ServiceCallBreaker
+    deferred_service_calls: dict[tuple[str, str], tuple[str, str, Any, Any]]
 
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        metrics: Metrics,
+        tracer: Tracer,
+        hass_client_factory: Callable[[str, str], HassClient] = HassClient,
+    ):
         """Initialize the Client class."""
 
         self.config = config
+        self.tracer = tracer
+        self.hass_client_factory = hass_client_factory
         self.called_services = {}
         self.on_connection_callbacks = []
+        self.on_event_callbacks = []
+        self.states = {}
+        self.unknown_entities = NegativeCache(config.homeassistant.unknown_entity_ttl)
+        self.own_contexts = OwnContexts(
+            config.homeassistant.own_context_ttl, OWN_CONTEXTS_MAX_SIZE
+        )
+        self.calls_in_flight: set[asyncio.Future] = set()
+        self.reconnect_manager = ReconnectManager(
+            self._connect,
+            Backoff(
+                config.homeassistant.reconnect_min_delay,
+                config.homeassistant.reconnect_max_delay,
+            ),
+        )
+        self.command_latency = metrics.histogram(
+            "websocket_command_duration_seconds",
+            "Latency of websocket commands sent to Home Assistant.",
+            ("command",),
+        )
+        self.events_received = metrics.counter(
+            "events_received_total",
+            "Events received from Home Assistant.",
+            ("event_type",),
+        )
+        self.self_caused_events = metrics.counter(
+            "self_caused_events_total",
+            "State changes caused by our own service calls.",
+        )
+        self.service_calls = metrics.counter(
+            "service_calls_total",
+            "Services called in Home Assistant.",
+            ("domain",),
+        )
+        self.service_breaker = ServiceCallBreaker(
+            config.homeassistant.service_breaker_window,
+            config.homeassistant.service_breaker_failure_rate,
+            Backoff(
+                config.homeassistant.service_breaker_min_cooldown,
+                config.homeassistant.service_breaker_max_cooldown,
+            ),
+        )
+        self.deferred_service_calls = {}
+        self.replay_task: asyncio.Task | None = None
+        self.service_calls_deferred = metrics.counter(
+            "service_calls_deferred_total",
+            "Service calls deferred while Home Assistant was unhealthy.",
+            ("domain",),
+        )
+        self.service_calls_rejected = metrics.counter(
+            "service_calls_rejected_total",
+            "Service calls rejected while Home Assistant was unhealthy.",
+            ("domain",),
+        )
+        metrics.gauge(
+            "deferred_service_calls",
+            "Service calls waiting for Home Assistant to recover.",
+            lambda: {(): len(self.deferred_service_calls)},
+        )
+        self.monitor_task: asyncio.Task | None = None
+        self.last_ping: datetime.datetime | None = None
+        self.slow_pings: int = 0
+        self.stalls: int = 0
+        self.proactive_reconnects: int = 0
+
+    @property
+    def connected(self) -> bool:
+        """Return whether the client is connected to Home Assistant."""
+
+        return hasattr(self, "client") and self.client.connected
 
     def register_on_connection(self, callback: Callable):
         """Register a callback to run when connected."""
@@ -39,29 +147,153 @@ class HomeAssistantClient:
         self.on_connection_callbacks.append(callback)
 
     async def connect(self):
-        """Enter the Client class."""
+        """Connect to Home Assistant, retrying with exponential backoff."""
+
+        await self.reconnect()
+
+    def reconnect(self) -> asyncio.Task:
+        """Start a reconnection unless one is already in flight."""
+
+        return self.reconnect_manager.reconnect()
 
-        self.client = HassClient(
+    async def _connect(self):
+        if self.monitor_task is not None and not self.monitor_task.done():
+            self.monitor_task.cancel()
+
+        if hasattr(self, "client"):
+            try:
+                await asyncio.wait_for(
+                    hass_client_adapter.close(self.client),
+                    self.config.homeassistant.ping_timeout,
+                )
+            except asyncio.TimeoutError:
+                logging.warning("Timed out disconnecting from Home Assistant")
+
+        client = self.hass_client_factory(
             self.config.homeassistant.url,
             self.config.homeassistant.token,
         )
+        # Reconnect through the manager, with backoff and resync.
+        hass_client_adapter.on_connection_lost(
+            client, lambda: self._on_connection_lost(client)
+        )
+        self.client = client
+
+        await self.client.connect()
+        logging.info("Connected to Home Assistant")
+
+        await self.client.subscribe_events(self.on_event)
+
+        self.slow_pings = 0
+        self.monitor_task = asyncio.get_running_loop().create_task(
+            self.monitor_connection()
+        )
+
+        await self.on_connected()
+
+    def _on_connection_lost(self, client: HassClient):
+        if client is not self.client:
+            return
+
+        logging.error("Lost the connection to Home Assistant, reconnecting")
+        self.reconnect()
+
+    async def disconnect(self):
+        """Disconnect from Home Assistant."""
+
+        self.reconnect_manager.cancel()
+
+        if self.monitor_task is not None and not self.monitor_task.done():
+            self.monitor_task.cancel()
+
+        if hasattr(self, "client"):
+            await hass_client_adapter.close(self.client)
+
+    @contextmanager
+    def measure(self, command: str) -> Iterator[None]:
+        """Record the latency of a websocket command."""
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.command_latency.observe(time.perf_counter() - start, command)
+
+    async def ping(self) -> float:
+        """Measure the round trip latency to Home Assistant.
+
+        The websocket ping is answered with a pong instead of a result, which
+        the hass client does not resolve, so a small command is used instead.
+        """
+
+        start = time.perf_counter()
+
+        with self.measure("ping"):
+            await self.client.send_command("get_config")
+
+        self.last_ping = datetime.datetime.now()
+
+        return time.perf_counter() - start
+
+    async def monitor_connection(self):
+        """Ping Home Assistant periodically and reconnect when degraded or lost."""
+
+        homeassistant_config = self.config.homeassistant
+
+        while self.connected:
+            await asyncio.sleep(homeassistant_config.ping_interval)
 
-        while not self.client.connected:
             try:
-                await self.client.connect()
-                logging.info("Connected to Home Assistant")
-            except (
-                NotConnected,
-                CannotConnect,
-                ConnectionFailed,
-            ):
-                logging.error("Not connected to Home Assistant, retrying in 5 seconds")
-                await asyncio.sleep(5)
-            except AuthenticationFailed:
-                logging.error("Authentication failed")
+                latency = await asyncio.wait_for(
+                    self.ping(), homeassistant_config.ping_timeout
+                )
+            except (NotConnected, ConnectionFailed) as ex:
+                logging.error("Lost the connection to Home Assistant: %r", ex)
                 break
+            except asyncio.TimeoutError:
+                self.stalls += 1
+                logging.error(
+                    f"Home Assistant did not answer within "
+                    f"{homeassistant_config.ping_timeout}s, reconnecting"
+                )
+                self.reconnect()
+                return
 
-        await self.on_connected()
+            if latency <= homeassistant_config.max_latency:
+                self.slow_pings = 0
+                continue
+
+            self.slow_pings += 1
+            logging.warning(f"High Home Assistant latency: {latency:.3f}s")
+
+            if self.slow_pings >= homeassistant_config.max_slow_pings:
+                self.proactive_reconnects += 1
+                logging.error("Home Assistant latency too high, reconnecting")
+                self.reconnect()
+                return
+
+        self.reconnect()
+
+    def connection_stats(self) -> dict[str, Any]:
+        """Return the connection health as a serializable dict."""
+
+        return {
+            "connected": self.connected,
+            "reconnecting": self.reconnect_manager.is_reconnecting,
+            "last_ping": self.last_ping.isoformat() if self.last_ping else None,
+            "slow_pings": self.slow_pings,
+            "stalls": self.stalls,
+            "proactive_reconnects": self.proactive_reconnects,
+            "service_calls": {
+                **self.service_breaker.as_dict(),
+                "deferred": len(self.deferred_service_calls),
+            },
+            "latency": {
+                command: histogram.as_dict()
+                for (command,), histogram in self.command_latency.items()
+            },
+        }
 
     async def on_connected(self):
         """Run when connected to Home Assistant."""
@@ -69,26 +301,179 @@ class HomeAssistantClient:
         for callback in self.on_connection_callbacks:
             await callback()
 
-    async def subscribe_events(self, on_event_callback: Callable) -> Callable:
-        """Subscribe to events."""
+        self.service_breaker.reset()
+        self.replay_deferred_service_calls()
 
-        return await self.client.subscribe_events(on_event_callback)
+    def subscribe_events(self, on_event_callback: Callable) -> Callable:
+        """Subscribe to events, surviving reconnections."""
 
-    async def get_state(self, entity_id: str) -> State:
-        """Return the state of an entity."""
+        self.on_event_callbacks.append(on_event_callback)
+
+        def unsubscribe():
+            self.on_event_callbacks.remove(on_event_callback)
+
+        return unsubscribe
+
+    async def on_event(self, event: Event):
+        """Run when an event is received from Home Assistant.
+
+        State changes caused by our own service calls are tagged with
+        `caused_by_self` in their data.
+        """
+
+        self.events_received.inc(event.event_type)
+        self.update_states(event)
+
+        if event.event_type == "state_changed" and await self.is_caused_by_self(event):
+            event.data["caused_by_self"] = True
+            self.self_caused_events.inc()
+
+        with self.tracer.trace(event):
+            for callback in self.on_event_callbacks:
+                await callback(event)
+
+    async def is_caused_by_self(self, event: Event) -> bool:
+        """Return whether an event was caused by one of our service calls.
+
+        Home Assistant sends the state changes caused by a service call
+        before its result, so an event by our own user while service calls
+        are in flight waits for them to return their context. Events by
+        anyone else are not held up, their context may still be matched
+        later with `is_own_context`.
+        """
+
+        context = get_context(event)
+
+        if context.get("id") in self.own_contexts:
+            return True
+
+        own_user_id = self.config.homeassistant.home_automations_user_id
+
+        if (
+            not own_user_id
+            or context.get("user_id") != own_user_id
+            or not self.calls_in_flight
+        ):
+            return False
+
+        await asyncio.wait(set(self.calls_in_flight), timeout=OWN_CONTEXT_WAIT)
+
+        return context.get("id") in self.own_contexts
+
+    def is_own_context(self, event: Event) -> bool:
+        """Return whether the context of an event is one of our service calls."""
+
+        return get_context_id(event) in self.own_contexts
+
+    async def resync(self):
+        """Fetch a bulk snapshot of all states and emit the missed changes.
+
+        On the first connection this only fills the state cache. After a
+        reconnection, a synthetic state changed event is emitted for every
+        entity whose state differs from the last known one.
+        """
+
+        with self.measure("get_states"):
+            states: list[dict[str, Any]] = await self.client.send_command("get_states")
+        snapshot = {state["entity_id"]: state for state in states}
+
+        known_states = self.states
+        self.states = snapshot
+
+        for entity_id in snapshot:
+            self.unknown_entities.invalidate(entity_id)
+
+        logging.info(f"Synced state cache with {len(snapshot)} states")
+
+        if not known_states:
+            return
+
+        changed_entity_ids = [
+            entity_id
+            for entity_id in known_states.keys() | snapshot.keys()
+            if self._has_changed(known_states.get(entity_id), snapshot.get(entity_id))
+        ]
+
+        logging.info(f"{len(changed_entity_ids)} entities changed while disconnected")
+
+        for entity_id in changed_entity_ids:
+            event = create_event(
+                "state_changed",
+                {
+                    "entity_id": entity_id,
+                    "old_state": known_states.get(entity_id),
+                    "new_state": snapshot.get(entity_id),
+                    "synthetic": True,
+                },
+            )
+
+            with self.tracer.trace(event):
+                for callback in self.on_event_callbacks:
+                    await callback(event)
+
+    @staticmethod
+    def _has_changed(
+        old_state: dict[str, Any] | None, new_state: dict[str, Any] | None
+    ) -> bool:
+        if old_state is None or new_state is None:
+            return old_state is not new_state
+
+        return (
+            old_state["state"] != new_state["state"]
+            or old_state["attributes"] != new_state["attributes"]
+        )
+
+    def update_states(self, event: Event):
+        """Keep the state cache up to date with state changed events."""
+
+        if event.event_type != "state_changed":
+            return
+
+        entity_id = event.data["entity_id"]
+        new_state = event.data.get("new_state")
+
+        if new_state is None:
+            self.states.pop(entity_id, None)
+            return
+
+        self.states[entity_id] = new_state
+        self.unknown_entities.invalidate(entity_id)
+
+    async def get_state(
+        self, entity_id: str, response_timeout: float | None = None
+    ) -> State:
+        """Return the state of an entity.
+
+        States missing from the cache are requested from Home Assistant,
+        which has to answer within `response_timeout` seconds, by default
+        `homeassistant.get_state_timeout`.
+        """
+
+        if entity_id in self.states:
+            return State(**self.states[entity_id])
+
+        if entity_id in self.unknown_entities:
+            raise NotFoundAgainError(entity_id)
+
+        if response_timeout is None:
+            response_timeout = self.config.homeassistant.get_state_timeout
 
         try:
-            state = await self.client.get_state(entity_id)
+            with self.measure("get_state"):
+                async with asyncio.timeout(response_timeout):
+                    state = await self.client.get_state(entity_id)
+        except TimeoutError:
+            raise RequestTimeoutError(
+                f"State of {entity_id} was not received within {response_timeout}s"
+            )
         except NotFoundError:
-            if entity_id not in self.unknown_entities:
-                self.unknown_entities.add(entity_id)
+            if not self.unknown_entities.add(entity_id):
                 raise
             raise NotFoundAgainError(entity_id)
 
         if state is None:
-            if entity_id not in self.unknown_entities:
-                self.unknown_entities.add(entity_id)
-                raise
+            if not self.unknown_entities.add(entity_id):
+                raise NotFoundError(f"Entity not found: {entity_id}")
             raise NotFoundAgainError(entity_id)
 
         return state
@@ -96,13 +481,7 @@ class HomeAssistantClient:
     async def get_attribute(self, entity_id: str, attribute: str) -> str:
         """Return the state of an entity."""
 
-        try:
-            state = await self.client.get_state(entity_id)
-        except NotFoundError:
-            if entity_id not in self.unknown_entities:
-                self.unknown_entities.add(entity_id)
-                raise
-            raise NotFoundAgainError(entity_id)
+        state = await self.get_state(entity_id)
 
         return str(state.attributes.get(attribute, None))
 
@@ -113,8 +492,23 @@ class HomeAssistantClient:
         service_data: dict[str, Any] | None = None,
         target: dict[str, Any] | None = None,
         timeout: datetime.timedelta | None = None,
-    ):
-        """Call a service."""
+        critical: bool = False,
+        response_timeout: float | None = None,
+    ) -> Any:
+        """Call a service.
+
+        The context id Home Assistant assigned to the call is recorded in the
+        current trace, so the resulting state changes can be matched to it.
+
+        While Home Assistant is unhealthy, calls targeting entities are
+        deferred and only the latest one per entity is made once it
+        recovered. Critical calls and calls without entities fail fast with a
+        ServiceUnavailableError instead.
+
+        `timeout` keeps the same call from being made again within that time,
+        `response_timeout` overrides `homeassistant.service_call_timeout`.
+        A call that is not answered in time raises a RequestTimeoutError.
+        """
 
         arg_hash = hash(
             (
@@ -133,7 +527,165 @@ class HomeAssistantClient:
 
             del self.called_services[arg_hash]
 
-        await self.client.call_service(domain, service, service_data, target)
+        if not self.service_breaker.allow():
+            self._defer_service_call(domain, service, service_data, target, critical)
+            return None
+
+        result = await self._call_service(
+            domain, service, service_data, target, response_timeout
+        )
 
         if timeout is not None:
             self.called_services[arg_hash] = datetime.datetime.now() + timeout
+
+        return result
+
+    async def _call_service(
+        self,
+        domain: str,
+        service: str,
+        service_data: dict[str, Any] | None,
+        target: dict[str, Any] | None,
+        response_timeout: float | None = None,
+    ) -> Any:
+        homeassistant_config = self.config.homeassistant
+
+        if response_timeout is None:
+            response_timeout = homeassistant_config.service_call_timeout
+
+        start = time.perf_counter()
+        in_flight = asyncio.get_running_loop().create_future()
+        self.calls_in_flight.add(in_flight)
+
+        try:
+            with span(
+                "call_service", service=f"{domain}.{service}", target=target
+            ) as service_span, self.measure("call_service"):
+                async with asyncio.timeout(response_timeout):
+                    result = await self.client.call_service(
+                        domain, service, service_data, target
+                    )
+
+                context_id = (
+                    result.get("context", {}).get("id")
+                    if isinstance(result, dict)
+                    else None
+                )
+
+                if context_id is not None:
+                    self.own_contexts.add(context_id)
+
+                if service_span is not None:
+                    service_span.attributes["context_id"] = context_id
+        except asyncio.TimeoutError:
+            self.service_breaker.record_failure(
+                TimeoutError(f"{domain}.{service} timed out")
+            )
+            raise RequestTimeoutError(
+                f"Service {domain}.{service} did not answer within "
+                f"{response_timeout}s"
+            )
+        except (NotConnected, ConnectionFailed) as ex:
+            self.service_breaker.record_failure(ex)
+            raise
+        except FailedCommand:
+            # Home Assistant answered, so it is healthy.
+            self._record_service_success()
+            raise
+        except BaseException:
+            self.service_breaker.release()
+            raise
+        finally:
+            self.calls_in_flight.discard(in_flight)
+            in_flight.set_result(None)
+
+        self.service_calls.inc(domain)
+
+        duration = time.perf_counter() - start
+
+        if duration > homeassistant_config.max_latency:
+            self.service_breaker.record_failure(
+                TimeoutError(f"{domain}.{service} took {duration:.3f}s")
+            )
+        else:
+            self._record_service_success()
+
+        return result
+
+    def _record_service_success(self):
+        if self.service_breaker.record_success():
+            self.replay_deferred_service_calls()
+
+    def _defer_service_call(
+        self,
+        domain: str,
+        service: str,
+        service_data: dict[str, Any] | None,
+        target: dict[str, Any] | None,
+        critical: bool,
+    ):
+        entity_ids = target.get("entity_id") if target is not None else None
+
+        if (
+            critical
+            or service in NON_DEFERRABLE_SERVICES
+            or target is None
+            or set(target) != {"entity_id"}
+        ):
+            entity_ids = None
+
+        if not entity_ids:
+            self.service_calls_rejected.inc(domain)
+            raise ServiceUnavailableError(
+                f"Service {domain}.{service} not called, Home Assistant is unhealthy"
+            )
+
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+
+        kind = "state" if service in STATE_SERVICES else f"{domain}.{service}"
+
+        for entity_id in entity_ids:
+            # Move the entity to the end, so the calls are made in the order
+            # of their latest change.
+            self.deferred_service_calls.pop((entity_id, kind), None)
+            self.deferred_service_calls[(entity_id, kind)] = (
+                domain,
+                service,
+                service_data,
+                {"entity_id": entity_id},
+            )
+
+        self.service_calls_deferred.inc(domain)
+
+    def replay_deferred_service_calls(self):
+        """Make the deferred service calls unless they are already being made."""
+
+        if not self.deferred_service_calls:
+            return
+
+        if self.replay_task is None or self.replay_task.done():
+            self.replay_task = asyncio.get_running_loop().create_task(
+                self._replay_deferred_service_calls()
+            )
+
+    async def _replay_deferred_service_calls(self):
+        logging.info("Calling %d deferred services", len(self.deferred_service_calls))
+
+        while (
+            self.deferred_service_calls
+            and self.service_breaker.state == BreakerState.CLOSED
+        ):
+            key = next(iter(self.deferred_service_calls))
+            domain, service, service_data, target = self.deferred_service_calls.pop(key)
+
+            try:
+                await self.call_service(domain, service, service_data, target)
+            except Exception as ex:
+                logging.warning(
+                    "Could not call deferred service %s.%s for %s: %s",
+                    domain,
+                    service,
+                    target["entity_id"],
+                    ex,
+                )
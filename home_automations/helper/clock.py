@@ -7,14 +7,16 @@ import pytz
 from pytz.tzinfo import BaseTzInfo
 
 from home_automations.helper.clock_events import ClockEvents
+from home_automations.helper.time_source import RealTimeSource, TimeSource
 from home_automations.models.config import Config
 
 
 class Clock:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, time_source: TimeSource | None = None):
         """Initialize the Clock class."""
 
         self.config: Config = config
+        self.time_source: TimeSource = time_source or RealTimeSource()
         self.tz: BaseTzInfo = pytz.timezone(config.timezone)
         self.last_day: int = -1
         self.last_hour: int = -1
@@ -26,70 +28,75 @@ class Clock:
     def register_module(self, module: ClockEvents):
         self.clock_events.append(module)
 
+    def unregister_module(self, module: ClockEvents):
+        """Stop the clock events and scheduled tasks of a module."""
+
+        self.clock_events.remove(module)
+        self.scheduled_tasks = [
+            entry
+            for entry in self.scheduled_tasks
+            if getattr(entry[0], "module", None) is not module
+        ]
+
     def register_task(self, task: Callable, interval: timedelta):
         if interval.total_seconds() < 1:
             raise ValueError("Interval must be at least 1 second")
-        self.scheduled_tasks.append((task, interval, datetime.now()))
+        self.scheduled_tasks.append((task, interval, self.current_datetime()))
 
     async def run(self):
         loop = asyncio.get_running_loop()
-        if self.current_day() != self.last_day:
-            self.last_day = self.current_day()
+        now = self.current_datetime()
+
+        if now.day != self.last_day:
+            self.last_day = now.day
             for module in self.clock_events:
-                loop.create_task(module.on_day_changed(self.current_day()))
+                loop.create_task(module.on_day_changed(now.day))
 
-        if self.current_hour() != self.last_hour:
-            self.last_hour = self.current_hour()
+        if now.hour != self.last_hour:
+            self.last_hour = now.hour
             for module in self.clock_events:
-                loop.create_task(module.on_hour_changed(self.current_hour()))
+                loop.create_task(module.on_hour_changed(now.hour))
 
-        if self.current_minute() != self.last_minute:
-            self.last_minute = self.current_minute()
+        if now.minute != self.last_minute:
+            self.last_minute = now.minute
             for module in self.clock_events:
-                loop.create_task(module.on_minute_changed(self.current_minute()))
+                loop.create_task(module.on_minute_changed(now.minute))
 
-        if self.current_second() != self.last_second:
-            self.last_second = self.current_second()
+        if now.second != self.last_second:
+            self.last_second = now.second
             for module in self.clock_events:
-                loop.create_task(module.on_second_changed(self.current_second()))
-                loop.create_task(self.run_tasks())
+                loop.create_task(module.on_second_changed(now.second))
 
-    async def run_tasks(self):
-        loop = asyncio.get_running_loop()
+            self.run_tasks(now)
 
-        invoked_tasks: list[tuple[Callable, timedelta, datetime]] = []
+    def run_tasks(self, now: datetime):
+        loop = asyncio.get_running_loop()
 
         for i, (task, interval, last_run) in enumerate(self.scheduled_tasks):
-            if datetime.now() - last_run >= interval:
+            if now - last_run >= interval:
                 loop.create_task(task())
-
-                entry = self.scheduled_tasks.pop(i)
-
-                invoked_tasks.append(entry)
-
-        for task, interval, last_run in invoked_tasks:
-            self.scheduled_tasks.append((task, interval, datetime.now()))
+                self.scheduled_tasks[i] = (task, interval, now)
 
     def current_datetime(self) -> datetime:
-        return datetime.now(self.tz)
+        return self.time_source.now(self.tz)
 
     def current_date(self) -> date:
-        return datetime.now(self.tz).date()
+        return self.current_datetime().date()
 
     def current_time(self) -> time:
-        return datetime.now(self.tz).time()
+        return self.current_datetime().time()
 
     def current_day(self) -> int:
-        return datetime.now(self.tz).day
+        return self.current_datetime().day
 
     def current_hour(self) -> int:
-        return datetime.now(self.tz).hour
+        return self.current_datetime().hour
 
     def current_minute(self) -> int:
-        return datetime.now(self.tz).minute
+        return self.current_datetime().minute
 
     def current_second(self) -> int:
-        return datetime.now(self.tz).second
+        return self.current_datetime().second
 
     def parse_time(self, time_string: str) -> time:
         if ":" in time_string:
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any
+
+from hass_client.models import Event, State
+
+from home_automations.helper.events import state_fields_changed
+from home_automations.helper.handler import Handler
+from home_automations.helper.metrics import Counter
+
+
+class StateCoalescer:
+    """Collapse bursts of state changes into a single callback call.
+
+    Changes within `window` seconds of the first one are merged, latest
+    wins: the callback gets the old state of the first change and the new
+    state of the last one. With `max_rate`, the callback is called at most
+    that many times per second and the changes in between are merged the
+    same way.
+
+    The callback calls are counted in `dispatched` by event type, the merged
+    changes in `filtered` by module.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        loop: asyncio.AbstractEventLoop,
+        dispatched: Counter,
+        filtered: Counter,
+        window: float = 0.0,
+        max_rate: float | None = None,
+    ):
+        self.handler = handler
+        self.loop = loop
+        self.dispatched = dispatched
+        self.filtered = filtered
+        self.window = window
+        self.interval = 1 / max_rate if max_rate else 0.0
+        self.pending: tuple[Event, dict[str, Any], dict[str, Any]] | None = None
+        self.last_call: float | None = None
+        self.task: asyncio.Task | None = None
+
+    async def push(self, event: Event):
+        """Pass on a state change now or merge it into the pending one."""
+
+        old_state = event.data["old_state"]
+        new_state = event.data["new_state"]
+
+        if self.pending is not None:
+            self.pending = (event, self.pending[1], new_state)
+            self.filtered.inc(self.handler.module.name, "coalesced")
+            return
+
+        now = self.loop.time()
+        due = now + self.window
+
+        if self.last_call is not None:
+            due = max(due, self.last_call + self.interval)
+
+        if due <= now:
+            await self._call(event, old_state, new_state)
+            return
+
+        self.pending = (event, old_state, new_state)
+        self.task = self.loop.create_task(self._flush(due - now))
+
+    async def _flush(self, delay: float):
+        await asyncio.sleep(delay)
+
+        if self.pending is None:
+            return
+
+        event, old_state, new_state = self.pending
+        self.pending = None
+
+        await self._call(event, old_state, new_state)
+
+    async def _call(
+        self, event: Event, old_state: dict[str, Any], new_state: dict[str, Any]
+    ):
+        self.last_call = self.loop.time()
+
+        # The merged changes may have cancelled each other out.
+        if self.handler.fields is not None and not state_fields_changed(
+            old_state, new_state, self.handler.fields
+        ):
+            self.filtered.inc(self.handler.module.name, "fields")
+            return
+
+        self.dispatched.inc(event.event_type)
+        await self.handler(event, State(**old_state), State(**new_state))
@@ -103,6 +103,7 @@ class TimeDayState(DayState):
 
 class DayStateResolver:
     def __init__(self, clock: Clock, client: HomeAssistantClient):
+        self.clock = clock
         self.client = client
 
     async def resolve(self, motion_light_config: MotionLightConfig) -> str:
@@ -120,7 +121,7 @@ class DayStateResolver:
         time_day_states = sorted(
             [
                 TimeDayState(
-                    Clock(self.client.config),
+                    self.clock,
                     state.scene,
                     state.time_state.time_from,
                     state.time_state.time_to,
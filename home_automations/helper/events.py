@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from hass_client.models import Event
+
+
+def create_event(event_type: str, data: dict[str, Any]) -> Event:
+    """Create an event that did not originate from Home Assistant."""
+
+    return Event(
+        event_type=event_type,
+        data=data,
+        origin="LOCAL",
+        time_fired=datetime.now(timezone.utc).isoformat(),
+        context={"id": uuid.uuid4().hex, "parent_id": None, "user_id": None},
+    )
+
+
+def get_context(event: Event) -> dict[str, Any]:
+    """Return the context of an event, empty if it has none."""
+
+    return event.context if isinstance(event.context, dict) else {}
+
+
+def get_context_id(event: Event) -> str | None:
+    """Return the id of the context of an event, if it has one."""
+
+    return get_context(event).get("id")
+
+
+def state_fields_changed(
+    old_state: dict[str, Any], new_state: dict[str, Any], fields: tuple[str, ...]
+) -> bool:
+    """Return whether any of the fields differs between two raw states.
+
+    The field `state` is the state itself, any other field is an attribute.
+    """
+
+    old_attributes = old_state.get("attributes") or {}
+    new_attributes = new_state.get("attributes") or {}
+
+    for field in fields:
+        if field == "state":
+            if old_state.get("state") != new_state.get("state"):
+                return True
+        elif old_attributes.get(field) != new_attributes.get(field):
+            return True
+
+    return False
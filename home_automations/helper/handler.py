@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+from home_automations.const import Priority
+from home_automations.helper.circuit_breaker import CircuitBreaker, CircuitBreakers
+from home_automations.helper.histogram import Histogram
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.scheduler import Deadline, HandlerScheduler
+from home_automations.helper.tracing import span
+from home_automations.models.exceptions import HandlerTimeoutError
+
+
+class HandlerStats:
+    """Timing statistics of all module callbacks."""
+
+    def __init__(self, metrics: Metrics, slow_threshold: float):
+        self.slow_threshold = slow_threshold
+        self.durations = metrics.histogram(
+            "handler_duration_seconds",
+            "Time spent in module callbacks.",
+            ("module", "callback"),
+        )
+        self.slow_calls = metrics.counter(
+            "slow_handler_calls_total",
+            "Module callbacks that exceeded the slow handler threshold.",
+            ("module", "callback"),
+        )
+        self.timeouts = metrics.counter(
+            "handler_timeouts_total",
+            "Module callbacks cancelled after exceeding their timeout.",
+            ("module", "callback"),
+        )
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the statistics of every callback, slowest first."""
+
+        return sorted(
+            (
+                {
+                    "module": module,
+                    "callback": callback,
+                    "slow_calls": self.slow_calls.values.get((module, callback), 0),
+                    "timeouts": self.timeouts.values.get((module, callback), 0),
+                    **histogram.as_dict(),
+                }
+                for (module, callback), histogram in self.durations.items()
+            ),
+            key=lambda stats: stats["sum"],
+            reverse=True,
+        )
+
+
+class Handler:
+    """Callback registered by a module, timed on every invocation.
+
+    Exceptions are passed on to the circuit breakers instead of being
+    raised, so a failing callback does not abort the dispatch to the others.
+    Every invocation waits for a slot of the scheduler by its priority and
+    is cancelled when it takes longer than `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        module: Any,
+        callback: Callable,
+        stats: HandlerStats,
+        breakers: CircuitBreakers,
+        scheduler: HandlerScheduler,
+        priority: Priority = Priority.NORMAL,
+        timeout: float | None = None,
+        ignore_self: bool = False,
+        fields: tuple[str, ...] | None = None,
+    ):
+        self.module = module
+        self.callback = callback
+        self.name: str = callback.__name__
+        self.stats = stats
+        self.breakers = breakers
+        self.scheduler = scheduler
+        self.priority = priority
+        self.timeout = timeout
+        self.ignore_self = ignore_self
+        self.fields = fields
+        self._histogram: Histogram | None = None
+        self._breaker: CircuitBreaker | None = None
+
+    @property
+    def histogram(self) -> Histogram:
+        # The module name may depend on attributes set after registration.
+        if self._histogram is None:
+            self._histogram = self.stats.durations.labels(self.module.name, self.name)
+
+        return self._histogram
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        if self._breaker is None:
+            self._breaker = self.breakers.get(self.module.name, self.name)
+
+        return self._breaker
+
+    async def __call__(self, *args: Any) -> Any:
+        if not self.scheduler.try_acquire(self.priority):
+            await self.scheduler.acquire(self.priority)
+
+        try:
+            return await self._run(*args)
+        finally:
+            self.scheduler.release()
+
+    async def _run(self, *args: Any) -> Any:
+        breaker = self.breaker
+
+        if not breaker.allow():
+            return None
+
+        trial = breaker.trial
+        start = time.perf_counter()
+        deadline = self.scheduler.start_deadline(self.timeout)
+
+        try:
+            with span(f"{self.module.name}.{self.name}"):
+                result = await self.callback(*args)
+        except asyncio.CancelledError:
+            # Only this callback was cancelled, not the dispatch it runs in.
+            if deadline is None or not deadline.take_back_cancel():
+                # The call has no result, let the next one try again.
+                if trial:
+                    breaker.release()
+
+                raise
+
+            self.stats.timeouts.inc(self.module.name, self.name)
+            self.breakers.record_failure(
+                self.module.name,
+                self.name,
+                HandlerTimeoutError(
+                    f"{self.module.name}.{self.name} did not finish within "
+                    f"{self.timeout}s"
+                ),
+            )
+            return None
+        except Exception as exception:
+            self.breakers.record_failure(self.module.name, self.name, exception)
+            return None
+        finally:
+            if deadline is not None:
+                self.scheduler.end_deadline(deadline)
+
+            duration = time.perf_counter() - start
+            self.histogram.observe(duration)
+
+            if duration > self.stats.slow_threshold:
+                self.stats.slow_calls.inc(self.module.name, self.name)
+                logging.warning(
+                    "Slow handler %s.%s took %.3fs for %s",
+                    self.module.name,
+                    self.name,
+                    duration,
+                    args[0] if args else None,
+                )
+
+        breaker.record_success()
+
+        if deadline is not None and deadline.expired:
+            await self._discard_cancel(deadline)
+
+        return result
+
+    async def _discard_cancel(self, deadline: Deadline):
+        """Keep a cancel the callback ignored from hitting the dispatch."""
+
+        self.stats.timeouts.inc(self.module.name, self.name)
+
+        if not deadline.take_back_cancel():
+            return
+
+        # The cancel may not have been delivered yet, let it arrive here.
+        try:
+            await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            if deadline.task.cancelling() > deadline.cancelling:
+                raise
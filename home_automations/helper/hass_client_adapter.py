@@ -0,0 +1,36 @@
+"""Access to internals of the hass client that it has no public API for.
+
+Written against the python-hass-client fork pinned in pyproject.toml,
+`tests/test_hass_client_adapter.py` checks that the fork still behaves as
+expected here. Keep all access to private attributes of the client in this
+module, so updating the pin only means updating it.
+"""
+
+from typing import Callable
+
+from hass_client import HomeAssistantClient as HassClient
+
+
+def on_connection_lost(client: HassClient, callback: Callable[[], None]):
+    """Call `callback` instead of reconnecting when the connection is lost.
+
+    The hass client reconnects on its own, without backoff and without
+    resubscribing. The callback is not called for `disconnect`.
+    """
+
+    client._on_connection_lost = callback  # type: ignore[method-assign]
+
+
+async def close(client: HassClient):
+    """Disconnect a hass client, also after it lost the connection.
+
+    The hass client only closes the session it created while it is connected,
+    a session passed to it is left open.
+    """
+
+    await client.disconnect()
+
+    session = getattr(client, "_http_session", None)
+
+    if session is not None and not getattr(client, "_http_session_provided", True):
+        await session.close()
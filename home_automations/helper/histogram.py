@@ -0,0 +1,71 @@
+from bisect import bisect_left
+from collections import deque
+from typing import Any
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """Histogram of durations in seconds.
+
+    Keeps cumulative bucket counts for export and a rolling window of recent
+    samples for percentiles.
+    """
+
+    def __init__(
+        self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, window: int = 1024
+    ):
+        self.buckets = buckets
+        self.bucket_counts: list[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.max: float = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float):
+        """Record a sample."""
+
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return the percentile (0-100) of the recent samples."""
+
+        if not self.samples:
+            return None
+
+        samples = sorted(self.samples)
+
+        return samples[round(percentile / 100 * (len(samples) - 1))]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary of the histogram as a serializable dict."""
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
@@ -1,16 +1,39 @@
+import atexit
 import logging
 import os
 import sys
 from abc import ABC
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from queue import SimpleQueue
 
 from home_automations.const import DEFAULT_LOGGING_PATH, ENV_LOG_FILE_PATH
 from home_automations.models.config import Config
 
 
+class RecordQueueHandler(QueueHandler):
+    """Enqueue the records as they are.
+
+    The default handler formats each record before enqueueing it, which
+    would happen on the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 class Logger(ABC):
+    listener: QueueListener | None = None
+    stop_registered: bool = False
+
     @classmethod
     def init(cls, config: Config):
+        """Route all log records through a queue to a background thread.
+
+        The event loop only enqueues records, formatting and file I/O happen
+        in the listener thread.
+        """
+
         log_file_path = Path(
             config.logging.path or os.getenv(ENV_LOG_FILE_PATH) or DEFAULT_LOGGING_PATH
         )
@@ -18,19 +41,51 @@ class Logger(ABC):
         if not log_file_path.is_absolute():
             log_file_path = config.config_file_path.parent / log_file_path
 
+        formatter = logging.Formatter(
+            fmt=config.logging.format, datefmt=config.logging.datefmt
+        )
+        handlers: list[logging.Handler] = [
+            RotatingFileHandler(
+                log_file_path,
+                mode=config.logging.filemode,
+                maxBytes=config.logging.max_bytes,
+                backupCount=config.logging.backup_count,
+            ),
+            logging.StreamHandler(sys.stdout),
+        ]
+
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+
+        cls.stop()
+        cls.listener = QueueListener(queue, *handlers, respect_handler_level=True)
+        cls.listener.start()
+
+        if not cls.stop_registered:
+            atexit.register(cls.stop)
+            cls.stop_registered = True
+
         logging.basicConfig(
             level=config.logging.level.upper()
             if isinstance(config.logging.level, str)
             else config.logging.level,
-            format=config.logging.format,
-            datefmt=config.logging.datefmt,
-            handlers=[
-                logging.FileHandler(log_file_path, mode=config.logging.filemode),
-                logging.StreamHandler(sys.stdout),
-            ],
+            handlers=[RecordQueueHandler(queue)],
+            force=True,
         )
 
         logging.getLogger("tibber").propagate = False
         logging.getLogger("tibber.response_handler").propagate = False
         logging.getLogger("asyncio").propagate = False
         logging.getLogger("hass_client").propagate = False
+
+    @classmethod
+    def stop(cls):
+        """Flush the queued records and stop the listener thread."""
+
+        if cls.listener is None:
+            return
+
+        cls.listener.stop()
+        cls.listener = None
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from home_automations.helper.metrics import Metrics
+
+
+class LoopMonitor:
+    """Measure the scheduling delay of the event loop.
+
+    A watchdog thread captures the stack of the loop thread whenever the
+    loop does not check in within the threshold, which points at the code
+    blocking the loop.
+    """
+
+    def __init__(self, metrics: Metrics, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = metrics.histogram(
+            "loop_lag_seconds", "Scheduling delay of the event loop."
+        )
+        self.blocked: deque[dict[str, Any]] = deque(maxlen=20)
+        self._heartbeat: float = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._stopped = threading.Event()
+
+    async def run(self):
+        """Measure the loop lag until cancelled."""
+
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+
+        threading.Thread(
+            target=self._watchdog, name="loop-watchdog", daemon=True
+        ).start()
+
+        try:
+            while True:
+                start = loop.time()
+                self._heartbeat = time.monotonic()
+
+                await asyncio.sleep(self.interval)
+
+                self.lag.observe(max(0.0, loop.time() - start - self.interval))
+        finally:
+            self._stopped.set()
+
+    def _watchdog(self):
+        captured_heartbeat: float | None = None
+
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+
+            if blocked_for < self.threshold or heartbeat == captured_heartbeat:
+                continue
+
+            captured_heartbeat = heartbeat
+
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+
+            if frame is None:
+                continue
+
+            stack = traceback.format_stack(frame)
+
+            self.blocked.append(
+                {
+                    "time": datetime.now().isoformat(),
+                    "blocked_for": blocked_for,
+                    "stack": stack,
+                }
+            )
+
+            logging.warning(
+                "Event loop blocked for at least %.3fs in:\n%s",
+                blocked_for,
+                "".join(stack),
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the loop lag and blocking captures as a serializable dict."""
+
+        return {
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "lag": self.lag.labels().as_dict(),
+            "blocked": list(self.blocked),
+        }
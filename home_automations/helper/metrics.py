@@ -0,0 +1,205 @@
+from collections import defaultdict
+from typing import Callable, Iterator
+
+from home_automations.helper.histogram import DEFAULT_BUCKETS, Histogram
+
+METRICS_PREFIX = "home_automations_"
+
+
+def _format_labels(label_names: tuple[str, ...], labels: tuple[str, ...]) -> str:
+    if not label_names:
+        return ""
+
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels
+    )
+
+    return (
+        "{"
+        + ",".join(f'{name}="{value}"' for name, value in zip(label_names, escaped))
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for metrics rendered in the Prometheus text format."""
+
+    type: str = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ):
+        self.name = METRICS_PREFIX + name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def render(self) -> Iterator[str]:
+        """Yield the lines of the metric."""
+
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self.render_samples()
+
+    def render_samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value.
+
+    Only ever updated from the event loop, so plain dict updates suffice.
+    """
+
+    type = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ):
+        super().__init__(name, documentation, label_names)
+        self.values: defaultdict[tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        """Increment the counter for the given label values."""
+
+        self.values[labels] += amount
+
+    def render_samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield (
+                f"{self.name}{_format_labels(self.label_names, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Metric):
+    """Value that is read from a callback when the metrics are collected."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple[str, ...], float]],
+        label_names: tuple[str, ...] = (),
+    ):
+        super().__init__(name, documentation, label_names)
+        self.callback = callback
+
+    def render_samples(self) -> Iterator[str]:
+        for labels, value in self.callback().items():
+            yield (
+                f"{self.name}{_format_labels(self.label_names, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class HistogramFamily(Metric):
+    """Histograms of durations in seconds, one per label combination."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+        self.histograms: dict[tuple[str, ...], Histogram] = {}
+
+    def labels(self, *labels: str) -> Histogram:
+        """Return the histogram for the given label values."""
+
+        histogram = self.histograms.get(labels)
+
+        if histogram is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+
+        return histogram
+
+    def observe(self, value: float, *labels: str):
+        """Record a sample for the given label values."""
+
+        self.labels(*labels).observe(value)
+
+    def items(self):
+        return self.histograms.items()
+
+    def render_samples(self) -> Iterator[str]:
+        bucket_label_names = self.label_names + ("le",)
+
+        for labels, histogram in self.histograms.items():
+            cumulative = 0
+
+            for bound, count in zip(
+                self.buckets + (float("inf"),), histogram.bucket_counts
+            ):
+                cumulative += count
+                bucket_labels = labels + (_format_value(bound),)
+                yield (
+                    f"{self.name}_bucket"
+                    f"{_format_labels(bucket_label_names, bucket_labels)} "
+                    f"{cumulative}"
+                )
+
+            formatted_labels = _format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{formatted_labels} {_format_value(histogram.sum)}"
+            yield f"{self.name}_count{formatted_labels} {histogram.count}"
+
+
+class Metrics:
+    """Registry of all metrics exported at /metrics.
+
+    Registering a metric with a name that already exists returns the
+    existing metric, so every module instance can register the metrics it
+    records.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def counter(
+        self, name: str, documentation: str, label_names: tuple[str, ...] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple[str, ...], float]],
+        label_names: tuple[str, ...] = (),
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, callback, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        return self._register(
+            HistogramFamily(name, documentation, label_names, buckets)
+        )
+
+    def _register(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text format."""
+
+        return "".join(
+            f"{line}\n" for metric in self.metrics.values() for line in metric.render()
+        )
@@ -0,0 +1,65 @@
+import time
+from typing import Any
+
+
+class NegativeCache:
+    """Remember entities that are known to be missing for a limited time."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits: int = 0
+        self._expiries: dict[str, float] = {}
+        self._reported: set[str] = set()
+
+    def __contains__(self, entity_id: object) -> bool:
+        if not isinstance(entity_id, str):
+            return False
+
+        expiry = self._expiries.get(entity_id)
+
+        if expiry is None:
+            return False
+
+        if expiry < time.monotonic():
+            del self._expiries[entity_id]
+            return False
+
+        self.hits += 1
+
+        return True
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+    def add(self, entity_id: str) -> bool:
+        """Add a missing entity and return whether it was reported before."""
+
+        self._expiries[entity_id] = time.monotonic() + self.ttl
+
+        if entity_id in self._reported:
+            return True
+
+        self._reported.add(entity_id)
+
+        return False
+
+    def invalidate(self, entity_id: str):
+        """Forget a missing entity, e.g. because it reappeared."""
+
+        self._expiries.pop(entity_id, None)
+        self._reported.discard(entity_id)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cached entities as a serializable dict."""
+
+        now = time.monotonic()
+
+        return {
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "entities": {
+                entity_id: expiry - now
+                for entity_id, expiry in self._expiries.items()
+                if expiry >= now
+            },
+        }
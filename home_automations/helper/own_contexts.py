@@ -0,0 +1,38 @@
+import time
+from collections import OrderedDict
+
+
+class OwnContexts:
+    """Context ids of the service calls made by the app.
+
+    Home Assistant attaches the context of a service call to the state
+    changes it causes, so they can be recognized as echoes of our own
+    writes. The ids expire after `ttl` seconds, and at most `size` of them
+    are kept.
+    """
+
+    def __init__(self, ttl: float, size: int):
+        self.ttl = ttl
+        self.size = size
+        self._expiries: OrderedDict[str, float] = OrderedDict()
+
+    def __contains__(self, context_id: object) -> bool:
+        if not isinstance(context_id, str):
+            return False
+
+        expiry = self._expiries.get(context_id)
+
+        return expiry is not None and expiry >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+    def add(self, context_id: str):
+        now = time.monotonic()
+        self._expiries[context_id] = now + self.ttl
+
+        # The ids are added in order of expiry, so the oldest come first.
+        while self._expiries and (
+            len(self._expiries) > self.size or next(iter(self._expiries.values())) < now
+        ):
+            self._expiries.popitem(last=False)
@@ -0,0 +1,172 @@
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from home_automations.const import PROFILE_SAMPLE_INTERVAL
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+class Profiler:
+    """Profile the running event loop on demand."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._snapshot: tracemalloc.Snapshot | None = None
+
+    async def _acquire(self):
+        if self._lock.locked():
+            raise ProfilerBusyError("A profile is already running")
+
+        await self._lock.acquire()
+
+    async def profile(self, seconds: float) -> cProfile.Profile:
+        """Profile the loop thread deterministically for some seconds.
+
+        The profiler hooks the thread, so every task that runs on the loop in
+        the meantime is profiled.
+        """
+
+        await self._acquire()
+
+        try:
+            profile = cProfile.Profile()
+            profile.enable()
+
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+
+            return profile
+        finally:
+            self._lock.release()
+
+    async def profile_pstats(self, seconds: float) -> bytes:
+        """Return a profile in the binary format read by pstats."""
+
+        profile = await self.profile(seconds)
+        profile.create_stats()
+
+        return marshal.dumps(profile.stats)
+
+    async def profile_text(self, seconds: float, limit: int) -> str:
+        """Return a profile as a pstats report sorted by cumulative time."""
+
+        profile = await self.profile(seconds)
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(limit)
+
+        return stream.getvalue()
+
+    async def sample(self, seconds: float) -> str:
+        """Sample the stack of the loop thread for some seconds.
+
+        Returns the samples as collapsed stacks, as read by flamegraph tools.
+        Each stack starts with the coroutine of the task that was running.
+        """
+
+        await self._acquire()
+
+        try:
+            samples = await asyncio.to_thread(
+                self._sample,
+                asyncio.get_running_loop(),
+                threading.get_ident(),
+                seconds,
+            )
+        finally:
+            self._lock.release()
+
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    def _sample(
+        self, loop: asyncio.AbstractEventLoop, thread_id: int, seconds: float
+    ) -> Counter[str]:
+        samples: Counter[str] = Counter()
+        end = time.monotonic() + seconds
+
+        while time.monotonic() < end:
+            frame = sys._current_frames().get(thread_id)
+
+            if frame is not None:
+                task = asyncio.current_task(loop)
+                stack = self._collapse(frame)
+
+                if task is not None:
+                    coro = task.get_coro()
+                    name = getattr(coro, "__qualname__", repr(coro))
+                    stack = f"task {name};{stack}"
+
+                samples[stack] += 1
+
+            time.sleep(PROFILE_SAMPLE_INTERVAL)
+
+        return samples
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        frames = []
+
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_qualname} ({Path(code.co_filename).name}:"
+                f"{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+
+        return ";".join(reversed(frames))
+
+    def memory_diff(self, limit: int) -> dict[str, Any]:
+        """Return the allocations that grew since the previous call.
+
+        The first call starts tracing allocations, which slows down the
+        application until tracing is stopped.
+        """
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._snapshot = None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        previous = self._snapshot
+        self._snapshot = snapshot
+
+        if previous is None:
+            return {"tracing": True, "baseline": True, "differences": []}
+
+        return {
+            "tracing": True,
+            "baseline": False,
+            "differences": [
+                {
+                    "location": str(difference.traceback),
+                    "size": difference.size,
+                    "size_diff": difference.size_diff,
+                    "count": difference.count,
+                    "count_diff": difference.count_diff,
+                }
+                for difference in snapshot.compare_to(previous, "lineno")[:limit]
+            ],
+        }
+
+    def stop_memory_tracing(self):
+        """Stop tracing allocations and drop the last snapshot."""
+
+        tracemalloc.stop()
+        self._snapshot = None
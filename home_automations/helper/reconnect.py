@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable
+
+from hass_client.exceptions import (
+    AuthenticationFailed,
+    CannotConnect,
+    ConnectionFailed,
+    NotConnected,
+)
+
+
+class Backoff:
+    """Exponential backoff with jitter."""
+
+    def __init__(
+        self,
+        min_delay: float,
+        max_delay: float,
+        factor: float = 2.0,
+        jitter: float = 0.5,
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        """Return the delay before the next attempt."""
+
+        delay = min(self.max_delay, self.min_delay * self.factor**self.attempt)
+        self.attempt += 1
+
+        return random.uniform(delay * (1 - self.jitter), delay)
+
+    def reset(self):
+        """Reset the backoff after a successful attempt."""
+
+        self.attempt = 0
+
+
+class ReconnectManager:
+    """Keep a single reconnection with exponential backoff in flight."""
+
+    def __init__(self, connect: Callable[[], Awaitable[None]], backoff: Backoff):
+        self._connect = connect
+        self.backoff = backoff
+        self.task: asyncio.Task | None = None
+
+    @property
+    def is_reconnecting(self) -> bool:
+        """Return whether a reconnection is in flight."""
+
+        return self.task is not None and not self.task.done()
+
+    def reconnect(self) -> asyncio.Task:
+        """Start a reconnection unless one is already in flight."""
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+        return self.task
+
+    def cancel(self):
+        """Cancel the reconnection in flight."""
+
+        if self.is_reconnecting and self.task is not None:
+            self.task.cancel()
+
+    async def _run(self):
+        while True:
+            try:
+                await self._connect()
+            except (NotConnected, CannotConnect, ConnectionFailed):
+                pass
+            except asyncio.CancelledError:
+                # The hass client cancels its pending commands when the
+                # connection is lost, that does not cancel the reconnection.
+                task = asyncio.current_task()
+
+                if task is None or task.cancelling():
+                    raise
+            except AuthenticationFailed:
+                logging.error("Authentication failed")
+                return
+            else:
+                self.backoff.reset()
+                return
+
+            delay = self.backoff.next_delay()
+            logging.error(
+                f"Not connected to Home Assistant, retrying in {delay:.1f} seconds"
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,80 @@
+import asyncio
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from hass_client.models import Event
+
+from home_automations.const import DEFAULT_RECORDING_PATH
+from home_automations.models.config import Config
+
+
+class EventRecorder:
+    """Record incoming events to a gzip compressed JSON lines file.
+
+    Records are buffered in memory and appended to the file in an executor,
+    so the event loop never waits for the disk. Every flush appends a new
+    gzip member, which gzip readers treat as one continuous stream.
+    """
+
+    def __init__(self, config: Config):
+        """Initialize the EventRecorder class."""
+
+        path = Path(config.recording.path or DEFAULT_RECORDING_PATH)
+
+        if not path.is_absolute():
+            path = config.config_file_path.parent / path
+
+        self.path: Path = path
+        self.buffer: list[str] = []
+
+    def _append(self, record: dict[str, Any]):
+        self.buffer.append(
+            json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        )
+
+    def record_states(self, states: Iterable[dict[str, Any]]):
+        """Record a snapshot of all states, e.g. after connecting."""
+
+        self._append({"type": "states", "time": time.time(), "states": list(states)})
+
+    async def record_event(self, event: Event):
+        """Record an incoming event."""
+
+        self._append(
+            {
+                "type": "event",
+                "time": time.time(),
+                "event": {
+                    "event_type": event.event_type,
+                    "data": event.data,
+                    "origin": event.origin,
+                    "time_fired": event.time_fired,
+                    "context": event.context,
+                },
+            }
+        )
+
+    async def flush(self):
+        """Append the buffered records to the file."""
+
+        if not self.buffer:
+            return
+
+        lines, self.buffer = self.buffer, []
+
+        await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+
+    def _write(self, lines: list[str]):
+        with gzip.open(self.path, "at", encoding="utf-8") as recording_file:
+            recording_file.writelines(lines)
+
+    @staticmethod
+    def read(path: Path) -> Iterator[dict[str, Any]]:
+        """Read the records of a recording."""
+
+        with gzip.open(path, "rt", encoding="utf-8") as recording_file:
+            for line in recording_file:
+                yield json.loads(line)
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable
+
+from home_automations.const import HANDLER_TIMEOUT_CHECK_INTERVAL, Priority
+from home_automations.helper.metrics import Metrics
+from home_automations.models.scheduler_config import SchedulerConfig
+
+
+class Deadline:
+    """Time by which a running callback has to finish."""
+
+    __slots__ = ("task", "time", "cancelling", "expired")
+
+    def __init__(self, task: asyncio.Task, time: float):
+        self.task = task
+        self.time = time
+        self.cancelling = task.cancelling()
+        self.expired = False
+
+    def expire(self):
+        self.expired = True
+        self.task.cancel()
+
+    def take_back_cancel(self) -> bool:
+        """Revoke the cancel of the expired deadline.
+
+        Return False if the task was cancelled by anyone else too, then the
+        cancellation has to go on.
+        """
+
+        if not self.expired or self.task.cancelling() != self.cancelling + 1:
+            return False
+
+        self.task.uncancel()
+
+        return True
+
+
+class HandlerScheduler:
+    """Run module callbacks by priority.
+
+    At most `max_concurrent_handlers` callbacks run at the same time. When
+    all slots are taken, a freed slot goes to the waiting callback with the
+    highest priority, unless a callback of a lower priority already waited
+    longer than `max_wait`, so background work is delayed but not starved.
+
+    Callbacks that exceed their deadline are cancelled. The deadlines are
+    checked every `HANDLER_TIMEOUT_CHECK_INTERVAL` while any are pending,
+    which is much cheaper than a timer per call.
+    """
+
+    def __init__(
+        self,
+        config: SchedulerConfig,
+        metrics: Metrics,
+        now: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config
+        self.now = now
+        self.running: int = 0
+        self.queued: int = 0
+        self.deadlines: set[Deadline] = set()
+        self.deadline_check: asyncio.TimerHandle | None = None
+        self.waiting: dict[Priority, deque[tuple[float, asyncio.Future]]] = {
+            priority: deque() for priority in Priority
+        }
+        wait_times = metrics.histogram(
+            "handler_wait_seconds",
+            "Time module callbacks waited for a free slot.",
+            ("priority",),
+        )
+        self.wait_times = {
+            priority: wait_times.labels(priority.name.lower()) for priority in Priority
+        }
+        self.promotions = metrics.counter(
+            "handler_promotions_total",
+            "Callbacks run before ones of a higher priority after waiting too long.",
+            ("priority",),
+        )
+        metrics.gauge(
+            "waiting_handlers",
+            "Module callbacks waiting for a free slot.",
+            lambda: {
+                (priority.name.lower(),): len(queue)
+                for priority, queue in self.waiting.items()
+            },
+            ("priority",),
+        )
+
+    def try_acquire(self, priority: Priority) -> bool:
+        """Take a free slot without waiting and return whether there was one."""
+
+        if self.queued or self.running >= self.config.max_concurrent_handlers:
+            return False
+
+        self.running += 1
+        self.wait_times[priority].observe(0.0)
+
+        return True
+
+    async def acquire(self, priority: Priority):
+        """Wait for a free slot, see `release`."""
+
+        if self.try_acquire(priority):
+            return
+
+        start = self.now()
+        entry = (start, asyncio.get_running_loop().create_future())
+        self.waiting[priority].append(entry)
+        self.queued += 1
+
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry[1].done() and not entry[1].cancelled():
+                self.release()
+            else:
+                self.waiting[priority].remove(entry)
+                self.queued -= 1
+            raise
+
+        self.wait_times[priority].observe(self.now() - start)
+
+    def release(self):
+        """Hand the slot of a finished callback to the next waiting one."""
+
+        priority = self._next_priority()
+
+        if priority is None:
+            self.running -= 1
+            return
+
+        _, future = self.waiting[priority].popleft()
+        self.queued -= 1
+        future.set_result(None)
+
+    def start_deadline(self, timeout: float | None) -> Deadline | None:
+        """Cancel the current task unless it ends the deadline within `timeout`."""
+
+        task = asyncio.current_task()
+
+        if timeout is None or task is None:
+            return None
+
+        deadline = Deadline(task, self.now() + timeout)
+        self.deadlines.add(deadline)
+
+        if self.deadline_check is None:
+            self.deadline_check = asyncio.get_running_loop().call_later(
+                HANDLER_TIMEOUT_CHECK_INTERVAL, self._check_deadlines
+            )
+
+        return deadline
+
+    def end_deadline(self, deadline: Deadline):
+        self.deadlines.discard(deadline)
+
+    def _check_deadlines(self):
+        self.deadline_check = None
+        now = self.now()
+
+        for deadline in self.deadlines:
+            if not deadline.expired and now >= deadline.time:
+                deadline.expire()
+
+        if self.deadlines:
+            self.deadline_check = asyncio.get_running_loop().call_later(
+                HANDLER_TIMEOUT_CHECK_INTERVAL, self._check_deadlines
+            )
+
+    def _next_priority(self) -> Priority | None:
+        if not self.queued:
+            return None
+
+        waiting = [priority for priority in Priority if self.waiting[priority]]
+
+        now = self.now()
+        starving = [
+            priority
+            for priority in waiting[1:]
+            if now - self.waiting[priority][0][0] >= self.config.max_wait
+        ]
+
+        if not starving:
+            return waiting[0]
+
+        priority = min(starving, key=lambda priority: self.waiting[priority][0][0])
+        self.promotions.inc(priority.name.lower())
+
+        return priority
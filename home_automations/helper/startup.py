@@ -0,0 +1,96 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable
+
+
+@dataclass
+class StartupPhase:
+    """Timing of a single startup phase."""
+
+    name: str
+    started: float
+    finished: float | None = None
+    error: str | None = None
+
+    @property
+    def duration(self) -> float | None:
+        """Return the duration of the phase in seconds."""
+
+        if self.finished is None:
+            return None
+
+        return self.finished - self.started
+
+
+class Startup:
+    """Track the phases of the application startup."""
+
+    def __init__(self) -> None:
+        self.started_at: datetime = datetime.now()
+        self.ready_at: datetime | None = None
+        self.phases: dict[str, StartupPhase] = {}
+        self._started: float = time.monotonic()
+
+    @property
+    def is_ready(self) -> bool:
+        """Return whether all startup phases have finished."""
+
+        return self.ready_at is not None
+
+    @property
+    def uptime(self) -> float:
+        """Return the seconds since the startup began."""
+
+        return time.monotonic() - self._started
+
+    async def run_phase(self, name: str, awaitable: Awaitable) -> Any:
+        """Await a startup phase and record its timing.
+
+        Phases that run after the startup has finished are not recorded.
+        """
+
+        if self.is_ready:
+            return await awaitable
+
+        phase = StartupPhase(name=name, started=self.uptime)
+        self.phases[name] = phase
+
+        try:
+            result = await awaitable
+        except Exception as ex:
+            phase.error = repr(ex)
+            raise
+        finally:
+            phase.finished = self.uptime
+
+        logging.info(f"Startup phase {name} finished in {phase.duration:.3f}s")
+
+        return result
+
+    def set_ready(self) -> None:
+        """Mark the startup as finished."""
+
+        if self.is_ready:
+            return
+
+        self.ready_at = datetime.now()
+
+        logging.info(f"Startup finished in {self.uptime:.3f}s")
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the startup state as a serializable dict."""
+
+        return {
+            "started_at": self.started_at.isoformat(),
+            "ready_at": self.ready_at.isoformat() if self.ready_at else None,
+            "phases": {
+                name: {
+                    "started": phase.started,
+                    "duration": phase.duration,
+                    "error": phase.error,
+                }
+                for name, phase in self.phases.items()
+            },
+        }
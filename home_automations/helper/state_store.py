@@ -0,0 +1,62 @@
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from home_automations.const import DEFAULT_PERSISTENCE_PATH
+from home_automations.models.config import Config
+
+
+class StateStore:
+    """Persist module runtime state to a compact JSON file."""
+
+    def __init__(self, config: Config):
+        """Initialize the StateStore class."""
+
+        path = Path(config.persistence.path or DEFAULT_PERSISTENCE_PATH)
+
+        if not path.is_absolute():
+            path = config.config_file_path.parent / path
+
+        self.path: Path = path
+        self._last_written: str | None = None
+
+    def load(self) -> dict[str, dict[str, Any]]:
+        """Load the snapshots from the state file."""
+
+        if not self.path.exists():
+            return {}
+
+        try:
+            with self.path.open("r") as state_file:
+                content = state_file.read()
+            snapshots = json.loads(content)
+        except (OSError, ValueError) as ex:
+            logging.warning(f"State file {self.path} could not be loaded: {ex}")
+            return {}
+
+        self._last_written = content
+
+        return snapshots
+
+    async def save(self, snapshots: dict[str, dict[str, Any]]):
+        """Save the snapshots to the state file if they changed."""
+
+        content = json.dumps(snapshots, separators=(",", ":"), sort_keys=True)
+
+        if content == self._last_written:
+            return
+
+        await asyncio.get_running_loop().run_in_executor(None, self._write, content)
+
+        self._last_written = content
+
+    def _write(self, content: str):
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+
+        with temp_path.open("w") as state_file:
+            state_file.write(content)
+
+        os.replace(temp_path, self.path)
@@ -0,0 +1,87 @@
+import asyncio
+import selectors
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any
+
+
+class TimeSource(ABC):
+    """Source of the current time for the clock."""
+
+    @abstractmethod
+    def now(self, tz: tzinfo) -> datetime:
+        """Return the current time in the given time zone."""
+
+
+class RealTimeSource(TimeSource):
+    """Time of the system clock."""
+
+    def now(self, tz: tzinfo) -> datetime:
+        return datetime.now(tz)
+
+
+class LoopTimeSource(TimeSource):
+    """Time that advances with the time of the running event loop.
+
+    Together with a VirtualEventLoop, the clock follows the virtual time.
+    """
+
+    def __init__(self, start: datetime):
+        self.start = start.astimezone(timezone.utc)
+        self.loop = asyncio.get_running_loop()
+        self.origin = self.loop.time()
+
+    def now(self, tz: tzinfo) -> datetime:
+        return (
+            self.start + timedelta(seconds=self.loop.time() - self.origin)
+        ).astimezone(tz)
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    """Selector that advances the virtual time instead of waiting."""
+
+    def __init__(self, loop: "VirtualEventLoop"):
+        self._loop = loop
+        self._selector = selectors.DefaultSelector()
+
+    def register(self, fileobj: Any, events: int, data: Any = None):
+        return self._selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj: Any):
+        return self._selector.unregister(fileobj)
+
+    def modify(self, fileobj: Any, events: int, data: Any = None):
+        return self._selector.modify(fileobj, events, data)
+
+    def select(self, timeout: float | None = None):
+        # Without timers there is nothing to skip to, so wait for I/O.
+        if timeout is None:
+            return self._selector.select()
+
+        events = self._selector.select(0)
+
+        if not events:
+            self._loop.virtual_time += timeout
+
+        return events
+
+    def get_map(self):
+        return self._selector.get_map()
+
+    def close(self):
+        self._selector.close()
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose time jumps to the next timer whenever it is idle.
+
+    Sleeps and timeouts complete as soon as nothing else is ready to run,
+    so a simulated day of schedules and delays runs in seconds.
+    """
+
+    def __init__(self):
+        self.virtual_time: float = 0.0
+        super().__init__(_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self.virtual_time
@@ -0,0 +1,149 @@
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterator
+
+from hass_client.models import Event
+
+from home_automations.helper.events import get_context_id
+
+
+@dataclass
+class Span:
+    """Timed step of a trace."""
+
+    name: str
+    start: float
+    duration: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class Trace:
+    """Everything that happened in reaction to one incoming event."""
+
+    trace_id: str
+    event_type: str
+    entity_id: str | None
+    context_id: str | None
+    started: datetime
+    start: float
+    spans: list[Span] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace as a serializable dict, offsets in seconds."""
+
+        return {
+            "trace_id": self.trace_id,
+            "event_type": self.event_type,
+            "entity_id": self.entity_id,
+            "context_id": self.context_id,
+            "started": self.started.isoformat(),
+            "spans": [
+                {
+                    "name": span.name,
+                    "offset": span.start - self.start,
+                    "duration": span.duration,
+                    "error": span.error,
+                    **span.attributes,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Trace | None:
+    """Return the trace of the event being handled, if any.
+
+    The trace is stored in a context variable, so tasks created while
+    handling an event inherit it.
+    """
+
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Record a span in the current trace, if there is one."""
+
+    trace = _current_trace.get()
+
+    if trace is None:
+        yield None
+        return
+
+    current_span = Span(name, time.perf_counter(), attributes=attributes)
+    trace.spans.append(current_span)
+
+    try:
+        yield current_span
+    except BaseException as exception:
+        current_span.error = type(exception).__name__
+        raise
+    finally:
+        current_span.duration = time.perf_counter() - current_span.start
+
+
+class Tracer:
+    """Ring buffer of the traces of the most recent handled events.
+
+    Only traces that reached at least one module callback are kept.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.traces: OrderedDict[str, Trace] = OrderedDict()
+
+    @contextmanager
+    def trace(self, event: Event) -> Iterator[Trace]:
+        """Start a trace for an incoming event."""
+
+        data = event.data or {}
+        trace = Trace(
+            trace_id=uuid.uuid4().hex,
+            event_type=event.event_type,
+            entity_id=data.get("entity_id"),
+            context_id=get_context_id(event),
+            started=datetime.now(),
+            start=time.perf_counter(),
+        )
+        token = _current_trace.set(trace)
+
+        try:
+            with span("event"):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+
+            if len(trace.spans) > 1:
+                self._add(trace)
+
+    def _add(self, trace: Trace):
+        self.traces[trace.trace_id] = trace
+
+        while len(self.traces) > self.size:
+            self.traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Trace | None:
+        return self.traces.get(trace_id)
+
+    def as_list(
+        self, limit: int | None = None, entity_id: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the most recent traces first."""
+
+        traces = [
+            trace.as_dict()
+            for trace in reversed(self.traces.values())
+            if entity_id is None or trace.entity_id == entity_id
+        ]
+
+        return traces[:limit]
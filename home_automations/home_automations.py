@@ -1,8 +1,10 @@
 import asyncio
 import logging
+from datetime import timedelta
 from typing import Any, Callable
 
 from fastapi import FastAPI
+from hass_client import HomeAssistantClient as HassClient
 from hass_client.exceptions import (
     CannotConnect,
     ConnectionFailed,
@@ -12,12 +14,30 @@ from hass_client.exceptions import (
 )
 from hass_client.models import Event
 
+from home_automations.const import CLOCK_TICK_INTERVAL
+from home_automations.helper.circuit_breaker import CircuitBreakers
 from home_automations.helper.client import HomeAssistantClient
 from home_automations.helper.clock import Clock
 from home_automations.helper.day_state import DayStateResolver
+from home_automations.helper.handler import HandlerStats
+from home_automations.helper.loop_monitor import LoopMonitor
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.profiler import Profiler
+from home_automations.helper.recorder import EventRecorder
+from home_automations.helper.scheduler import HandlerScheduler
+from home_automations.helper.startup import Startup
+from home_automations.helper.state_store import StateStore
+from home_automations.helper.time_source import TimeSource
+from home_automations.helper.tracing import Tracer
 from home_automations.home_automations_api import HomeAutomationsApi
 from home_automations.models.config import Config
-from home_automations.models.exceptions import NotFoundAgainError, ServiceTimeoutError
+from home_automations.models.exceptions import (
+    HandlerTimeoutError,
+    NotFoundAgainError,
+    RequestTimeoutError,
+    ServiceTimeoutError,
+    ServiceUnavailableError,
+)
 from home_automations.modules.base_module import BaseModule
 from home_automations.modules.dimmer_module import DimmerModule
 from home_automations.modules.dummy_module import DummyModule
@@ -31,11 +51,17 @@ from home_automations.tools import Tools
 
 
 class HomeAutomations:
-    def __init__(self, fastapi: FastAPI):
+    def __init__(
+        self,
+        fastapi: FastAPI,
+        hass_client_factory: Callable[[str, str], HassClient] = HassClient,
+        time_source: TimeSource | None = None,
+    ):
         """Initialize the HomeAutomations class."""
 
         self.fastapi = fastapi
-        self.connection_task: asyncio.Task | None = None
+        self.startup_task: asyncio.Task | None = None
+        self.loop_monitor_task: asyncio.Task | None = None
         self.update_task: asyncio.Task | None = None
         self.loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
 
@@ -43,9 +69,35 @@ class HomeAutomations:
 
         self.config: Config = fastapi.state.config
 
-        client = HomeAssistantClient(self.config)
-        clock = Clock(self.config)
-        api = HomeAutomationsApi(fastapi)
+        self.startup = Startup()
+        self.state_store = StateStore(self.config)
+
+        metrics = Metrics()
+        tracer = Tracer(self.config.monitoring.trace_buffer_size)
+        client = HomeAssistantClient(self.config, metrics, tracer, hass_client_factory)
+        clock = Clock(self.config, time_source)
+        handler_stats = HandlerStats(
+            metrics, self.config.monitoring.slow_handler_threshold
+        )
+        breakers = CircuitBreakers(
+            self.config.breaker, metrics, self.handle_exception, self.loop.time
+        )
+        self.loop_monitor = LoopMonitor(
+            metrics,
+            self.config.monitoring.loop_lag_interval,
+            self.config.monitoring.loop_lag_threshold,
+        )
+        api = HomeAutomationsApi(
+            fastapi,
+            self.startup,
+            client,
+            metrics,
+            handler_stats,
+            self.loop_monitor,
+            tracer,
+            breakers,
+            Profiler() if self.config.monitoring.profiling else None,
+        )
         day_state = DayStateResolver(clock, client)
         self.tools = Tools(
             loop=self.loop,
@@ -53,6 +105,20 @@ class HomeAutomations:
             clock=clock,
             api=api,
             day_state_resolver=day_state,
+            metrics=metrics,
+            handler_stats=handler_stats,
+            breakers=breakers,
+            scheduler=HandlerScheduler(self.config.scheduler, metrics, self.loop.time),
+        )
+
+        self.clock_tick_lag = metrics.histogram(
+            "clock_tick_lag_seconds",
+            "Delay of the clock ticks behind their schedule.",
+        )
+        metrics.gauge(
+            "tasks",
+            "Tasks on the event loop.",
+            lambda: {(): len(asyncio.all_tasks(self.loop))},
         )
 
         self.tools.client.register_on_connection(self.on_connection)
@@ -96,20 +162,115 @@ class HomeAutomations:
             ]
         )
 
+        self.restore_modules()
+
+        self.tools.clock.register_task(
+            self.persist_modules, timedelta(seconds=self.config.persistence.interval)
+        )
+
+        self.recorder: EventRecorder | None = None
+
+        if self.config.recording.enabled:
+            self.recorder = EventRecorder(self.config)
+            self.tools.client.subscribe_events(self.recorder.record_event)
+            self.tools.clock.register_task(
+                self.flush_recording,
+                timedelta(seconds=self.config.recording.interval),
+            )
+
     async def start(self):
-        """Handle application start."""
+        """Handle application start.
 
-        await self.tools.client.connect()
+        The startup runs in the background so the API is served immediately.
+        """
+
+        self.loop_monitor_task = self.loop.create_task(self.loop_monitor.run())
+        self.startup_task = self.loop.create_task(
+            self.handle_exception_in_func(self.run_startup)
+        )
+
+    async def stop(self):
+        """Handle application shutdown."""
+
+        for task in (self.startup_task, self.update_task, self.loop_monitor_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+        await self.persist_modules()
+        await self.flush_recording()
+        await self.tools.client.disconnect()
+
+    def restore_modules(self):
+        """Restore the runtime state of the modules from the last snapshot."""
+
+        snapshots = self.state_store.load()
+        restored = 0
+
+        for module in self.modules:
+            if module.name not in snapshots:
+                continue
+
+            try:
+                module.restore(snapshots[module.name])
+            except (KeyError, TypeError, ValueError) as ex:
+                logging.warning("Could not restore state of %s: %s", module.name, ex)
+                continue
+
+            restored += 1
+
+        logging.info("Restored state of %d modules", restored)
+
+    async def persist_modules(self):
+        """Persist the runtime state of the modules."""
+
+        snapshots = {}
+
+        for module in self.modules:
+            snapshot = module.snapshot()
+
+            if snapshot is not None:
+                snapshots[module.name] = snapshot
+
+        await self.handle_exception_in_func(self.state_store.save, snapshots)
+
+    async def flush_recording(self):
+        """Write the recorded events to the recording file."""
+
+        if self.recorder is not None:
+            await self.handle_exception_in_func(self.recorder.flush)
+
+    async def run_startup(self):
+        """Connect to Home Assistant and start the modules in parallel."""
 
-    async def on_connection(self):
         async def on_event(event: Event):
             await self.handle_exception_in_func(self.on_event, event)
 
-        await self.handle_exception_in_func(
-            self.tools.client.subscribe_events,
-            on_event,
+        self.tools.client.subscribe_events(on_event)
+
+        await asyncio.gather(
+            self.startup.run_phase("connect", self.tools.client.connect()),
+            self.startup.run_phase(
+                "modules",
+                asyncio.gather(*[module.on_start() for module in self.modules]),
+            ),
         )
 
+        if self.tools.client.connected:
+            self.startup.set_ready()
+
+    async def on_connection(self):
+        # A connection lost during the resync fails the connection attempt,
+        # so the reconnect manager retries it with backoff.
+        try:
+            await self.startup.run_phase("resync", self.tools.client.resync())
+        except (NotConnected, CannotConnect, ConnectionFailed):
+            raise
+        except Exception as ex:
+            self.handle_exception(ex)
+
+        if self.recorder is not None:
+            self.recorder.record_states(self.tools.client.states.values())
+
         if (
             self.update_task is None
             or self.update_task.done()
@@ -120,19 +281,30 @@ class HomeAutomations:
     async def update(self):
         while True:
             await self.handle_exception_in_func(self.tools.clock.run)
-            await asyncio.sleep(0.25)
+
+            start = self.loop.time()
+            await asyncio.sleep(CLOCK_TICK_INTERVAL)
+            self.clock_tick_lag.observe(
+                max(0.0, self.loop.time() - start - CLOCK_TICK_INTERVAL)
+            )
 
     async def on_event(self, event: Event):
-        """Handle an event from Home Assistant."""
+        """Handle an event from Home Assistant.
+
+        An exception in one module does not keep the event from the others.
+        """
 
         for module in self.modules:
-            await module.on_event(event)
+            try:
+                await module.on_event(event)
 
-            if event.event_type == "state_changed":
-                await module.on_state_changed(event)
+                if event.event_type == "state_changed":
+                    await module.on_state_changed(event)
 
-            if event.event_type == "zha_event":
-                await module.on_zha_event(event)
+                if event.event_type == "zha_event":
+                    await module.on_zha_event(event)
+            except Exception as ex:
+                self.handle_exception(ex)
 
     def handle_exception_in_loop(
         self, loop: asyncio.AbstractEventLoop, context: dict[str, Any]
@@ -162,6 +334,12 @@ class HomeAutomations:
                 logging.debug(exception)
             case ServiceTimeoutError():
                 logging.debug(exception)
+            case (
+                ServiceUnavailableError()
+                | RequestTimeoutError()
+                | HandlerTimeoutError()
+            ):
+                logging.warning(exception)
             case asyncio.CancelledError():
                 logging.error("Operation was cancelled")
             case FailedCommand():
@@ -174,10 +352,6 @@ class HomeAutomations:
                 ):
                     self.update_task.cancel()
 
-                if self.connection_task is not None and not self.connection_task.done():
-                    return
-                self.connection_task = self.loop.create_task(
-                    self.tools.client.connect()
-                )
+                self.tools.client.reconnect()
             case Exception():
                 logging.exception(exception)
@@ -1,28 +1,234 @@
+import asyncio
+import json
 from datetime import datetime
+from typing import Any, AsyncIterator, Literal
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from home_automations.const import (
+    PROFILE_MAX_DURATION,
+    STATUS_STREAM_KEEPALIVE_INTERVAL,
+)
+from home_automations.helper.circuit_breaker import CircuitBreakers
+from home_automations.helper.client import HomeAssistantClient
+from home_automations.helper.handler import HandlerStats
+from home_automations.helper.loop_monitor import LoopMonitor
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.profiler import Profiler, ProfilerBusyError
+from home_automations.helper.startup import Startup
+from home_automations.helper.tracing import Tracer
 
 
 class HomeAutomationsApi:
     _last_state_changed: datetime
     _last_post: datetime
 
-    def __init__(self, fastapi: FastAPI) -> None:
+    def __init__(
+        self,
+        fastapi: FastAPI,
+        startup: Startup,
+        client: HomeAssistantClient,
+        metrics: Metrics,
+        handler_stats: HandlerStats,
+        loop_monitor: LoopMonitor,
+        tracer: Tracer,
+        breakers: CircuitBreakers,
+        profiler: Profiler | None = None,
+    ) -> None:
         self._last_state_changed = datetime.now()
         self._last_post = datetime.now()
+        self._startup = startup
+        self._client = client
+        self._metrics = metrics
+        self._handler_stats = handler_stats
+        self._loop_monitor = loop_monitor
+        self._tracer = tracer
+        self._breakers = breakers
+        self._profiler = profiler
+        self._status_subscribers: set[asyncio.Queue[dict[str, Any]]] = set()
+
+        metrics.gauge(
+            "last_state_changed_timestamp_seconds",
+            "Time of the last observed change of the dummy switch.",
+            lambda: {(): self._last_state_changed.timestamp()},
+        )
 
         fastapi.add_api_route("/status", self.get_status, methods=["GET"])
         fastapi.add_api_route("/status", self.post_status, methods=["POST"])
+        fastapi.add_api_route("/status/stream", self.get_status_stream, methods=["GET"])
+        fastapi.add_api_route("/health/live", self.get_live, methods=["GET"])
+        fastapi.add_api_route("/health/ready", self.get_ready, methods=["GET"])
+        fastapi.add_api_route("/connection", self.get_connection, methods=["GET"])
+        fastapi.add_api_route(
+            "/unknown_entities", self.get_unknown_entities, methods=["GET"]
+        )
+        fastapi.add_api_route("/metrics", self.get_metrics, methods=["GET"])
+        fastapi.add_api_route("/handlers", self.get_handlers, methods=["GET"])
+        fastapi.add_api_route("/loop", self.get_loop, methods=["GET"])
+        fastapi.add_api_route("/traces", self.get_traces, methods=["GET"])
+        fastapi.add_api_route("/traces/{trace_id}", self.get_trace, methods=["GET"])
+        fastapi.add_api_route("/breakers", self.get_breakers, methods=["GET"])
+
+        if profiler is not None:
+            fastapi.add_api_route("/profile/cpu", self.get_profile_cpu, methods=["GET"])
+            fastapi.add_api_route(
+                "/profile/memory", self.get_profile_memory, methods=["GET"]
+            )
+            fastapi.add_api_route(
+                "/profile/memory", self.delete_profile_memory, methods=["DELETE"]
+            )
+
+    @property
+    def status(self) -> dict[str, Any]:
+        """Return the current status."""
 
-    async def get_status(self):
         return {
             "last_state_changed": self._last_state_changed.isoformat(),
             "last_post": self._last_post.isoformat(),
         }
 
+    @property
+    def status_etag(self) -> str:
+        """Return the entity tag of the current status."""
+
+        return f'"{self._last_state_changed.timestamp()}-{self._last_post.timestamp()}"'
+
+    def set_last_state_changed(self, last_state_changed: datetime):
+        """Set the time of the last state change and push the new status."""
+
+        self._last_state_changed = last_state_changed
+        self._publish_status()
+
+    def _publish_status(self):
+        status = self.status
+
+        for queue in self._status_subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(status)
+
+    async def get_status(self, request: Request):
+        etag = self.status_etag
+        headers = {"ETag": etag}
+
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        return JSONResponse(self.status, headers=headers)
+
     async def post_status(self):
         self._last_post = datetime.now()
+        self._publish_status()
+        return self.status
+
+    async def get_status_stream(self):
+        return StreamingResponse(self._stream_status(), media_type="text/event-stream")
+
+    async def _stream_status(self) -> AsyncIterator[str]:
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=1)
+        self._status_subscribers.add(queue)
+
+        try:
+            yield f"data: {json.dumps(self.status)}\n\n"
+
+            while True:
+                try:
+                    status = await asyncio.wait_for(
+                        queue.get(), STATUS_STREAM_KEEPALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield f"data: {json.dumps(status)}\n\n"
+        finally:
+            self._status_subscribers.discard(queue)
+
+    async def get_live(self):
         return {
-            "last_state_changed": self._last_state_changed.isoformat(),
-            "last_post": self._last_post.isoformat(),
+            "alive": True,
+            "uptime": self._startup.uptime,
         }
+
+    async def get_ready(self):
+        ready = self._startup.is_ready and self._client.connected
+
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={
+                "ready": ready,
+                "connected": self._client.connected,
+                "startup": self._startup.as_dict(),
+            },
+        )
+
+    async def get_connection(self):
+        return self._client.connection_stats()
+
+    async def get_unknown_entities(self):
+        return self._client.unknown_entities.as_dict()
+
+    async def get_metrics(self):
+        return PlainTextResponse(
+            self._metrics.render(), media_type="text/plain; version=0.0.4"
+        )
+
+    async def get_handlers(self):
+        return self._handler_stats.as_list()
+
+    async def get_loop(self):
+        return self._loop_monitor.as_dict()
+
+    async def get_traces(self, limit: int = 50, entity_id: str | None = None):
+        return self._tracer.as_list(limit, entity_id)
+
+    async def get_trace(self, trace_id: str):
+        trace = self._tracer.get(trace_id)
+
+        if trace is None:
+            raise HTTPException(status_code=404, detail="Trace not found")
+
+        return trace.as_dict()
+
+    async def get_breakers(self):
+        return self._breakers.as_list()
+
+    async def get_profile_cpu(
+        self,
+        seconds: float = Query(10, gt=0, le=PROFILE_MAX_DURATION),
+        format: Literal["collapsed", "pstats", "text"] = "collapsed",
+        limit: int = 50,
+    ):
+        assert self._profiler is not None
+
+        try:
+            if format == "pstats":
+                return Response(
+                    await self._profiler.profile_pstats(seconds),
+                    media_type="application/octet-stream",
+                    headers={
+                        "Content-Disposition": 'attachment; filename="profile.pstats"'
+                    },
+                )
+
+            if format == "text":
+                return PlainTextResponse(
+                    await self._profiler.profile_text(seconds, limit)
+                )
+
+            return PlainTextResponse(await self._profiler.sample(seconds))
+        except ProfilerBusyError as ex:
+            raise HTTPException(status_code=409, detail=str(ex))
+
+    async def get_profile_memory(self, limit: int = 25):
+        assert self._profiler is not None
+
+        return self._profiler.memory_diff(limit)
+
+    async def delete_profile_memory(self):
+        assert self._profiler is not None
+
+        self._profiler.stop_memory_tracing()
+
+        return {"tracing": False}
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+from home_automations.const import (
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    DEFAULT_BREAKER_MAX_COOLDOWN,
+    DEFAULT_BREAKER_MIN_COOLDOWN,
+)
+
+
+@dataclass
+class BreakerConfig:
+    """Configuration for disabling module callbacks that keep failing."""
+
+    failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD
+    min_cooldown: float = DEFAULT_BREAKER_MIN_COOLDOWN
+    max_cooldown: float = DEFAULT_BREAKER_MAX_COOLDOWN
@@ -7,12 +7,17 @@ import marshmallow_dataclass
 import yaml
 
 from home_automations.models.api_config import ApiConfig
+from home_automations.models.breaker_config import BreakerConfig
 from home_automations.models.climate_config import ClimateConfig
 from home_automations.models.dimmer_config import DimmerConfig
 from home_automations.models.homeassistant_config import HomeAssistantConfig
 from home_automations.models.light_replacement_config import LightReplacementConfig
 from home_automations.models.logging_config import LoggingConfig
+from home_automations.models.monitoring_config import MonitoringConfig
 from home_automations.models.motion_light_config import MotionLightConfig
+from home_automations.models.persistence_config import PersistenceConfig
+from home_automations.models.recording_config import RecordingConfig
+from home_automations.models.scheduler_config import SchedulerConfig
 from home_automations.models.sensor_notify_config import SensorNotifyConfig
 from home_automations.models.tibber_config import TibberConfig
 from home_automations.models.timed_light_config import TimedLightConfig
@@ -31,6 +36,11 @@ class Config:
     )
     logging: LoggingConfig = field(default_factory=LoggingConfig)
     api: ApiConfig = field(default_factory=ApiConfig)
+    persistence: PersistenceConfig = field(default_factory=PersistenceConfig)
+    monitoring: MonitoringConfig = field(default_factory=MonitoringConfig)
+    recording: RecordingConfig = field(default_factory=RecordingConfig)
+    breaker: BreakerConfig = field(default_factory=BreakerConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
     dimmer_configs: list[DimmerConfig] = field(default_factory=list)
     timed_light_configs: list[TimedLightConfig] = field(default_factory=list)
     motion_light_configs: list[MotionLightConfig] = field(default_factory=list)
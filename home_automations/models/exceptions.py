@@ -11,3 +11,15 @@ class NotFoundAgainError(Exception):
 
 class ServiceTimeoutError(Exception):
     """Raised when a service call was not successful due to recently being called."""
+
+
+class ServiceUnavailableError(Exception):
+    """Raised when a service is not called because Home Assistant is unhealthy."""
+
+
+class RequestTimeoutError(Exception):
+    """Raised when Home Assistant does not answer a request in time."""
+
+
+class HandlerTimeoutError(Exception):
+    """Raised when a module callback does not finish in time."""
@@ -1,5 +1,22 @@
 from dataclasses import dataclass, field
 
+from home_automations.const import (
+    DEFAULT_GET_STATE_TIMEOUT,
+    DEFAULT_MAX_LATENCY,
+    DEFAULT_MAX_SLOW_PINGS,
+    DEFAULT_OWN_CONTEXT_TTL,
+    DEFAULT_PING_INTERVAL,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_RECONNECT_MAX_DELAY,
+    DEFAULT_RECONNECT_MIN_DELAY,
+    DEFAULT_SERVICE_BREAKER_FAILURE_RATE,
+    DEFAULT_SERVICE_BREAKER_MAX_COOLDOWN,
+    DEFAULT_SERVICE_BREAKER_MIN_COOLDOWN,
+    DEFAULT_SERVICE_BREAKER_WINDOW,
+    DEFAULT_SERVICE_CALL_TIMEOUT,
+    DEFAULT_UNKNOWN_ENTITY_TTL,
+)
+
 
 @dataclass
 class HomeAssistantConfig:
@@ -8,3 +25,17 @@ class HomeAssistantConfig:
     url: str
     token: str
     home_automations_user_id: str = field(default="")
+    reconnect_min_delay: float = DEFAULT_RECONNECT_MIN_DELAY
+    reconnect_max_delay: float = DEFAULT_RECONNECT_MAX_DELAY
+    ping_interval: float = DEFAULT_PING_INTERVAL
+    ping_timeout: float = DEFAULT_PING_TIMEOUT
+    max_latency: float = DEFAULT_MAX_LATENCY
+    max_slow_pings: int = DEFAULT_MAX_SLOW_PINGS
+    unknown_entity_ttl: float = DEFAULT_UNKNOWN_ENTITY_TTL
+    service_call_timeout: float = DEFAULT_SERVICE_CALL_TIMEOUT
+    get_state_timeout: float = DEFAULT_GET_STATE_TIMEOUT
+    service_breaker_window: int = DEFAULT_SERVICE_BREAKER_WINDOW
+    service_breaker_failure_rate: float = DEFAULT_SERVICE_BREAKER_FAILURE_RATE
+    service_breaker_min_cooldown: float = DEFAULT_SERVICE_BREAKER_MIN_COOLDOWN
+    service_breaker_max_cooldown: float = DEFAULT_SERVICE_BREAKER_MAX_COOLDOWN
+    own_context_ttl: float = DEFAULT_OWN_CONTEXT_TTL
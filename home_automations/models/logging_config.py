@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 
 from home_automations.const import (
+    DEFAULT_LOGGING_BACKUP_COUNT,
     DEFAULT_LOGGING_DATEFMT,
     DEFAULT_LOGGING_FILEMODE,
     DEFAULT_LOGGING_FMT,
     DEFAULT_LOGGING_LEVEL,
+    DEFAULT_LOGGING_MAX_BYTES,
 )
 
 
@@ -17,3 +19,5 @@ class LoggingConfig:
     format: str = DEFAULT_LOGGING_FMT
     datefmt: str = DEFAULT_LOGGING_DATEFMT
     filemode: str = DEFAULT_LOGGING_FILEMODE
+    max_bytes: int = DEFAULT_LOGGING_MAX_BYTES
+    backup_count: int = DEFAULT_LOGGING_BACKUP_COUNT
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+from home_automations.const import (
+    DEFAULT_LOOP_LAG_INTERVAL,
+    DEFAULT_LOOP_LAG_THRESHOLD,
+    DEFAULT_PROFILING,
+    DEFAULT_SLOW_HANDLER_THRESHOLD,
+    DEFAULT_TRACE_BUFFER_SIZE,
+)
+
+
+@dataclass
+class MonitoringConfig:
+    """Configuration for runtime monitoring."""
+
+    slow_handler_threshold: float = DEFAULT_SLOW_HANDLER_THRESHOLD
+    loop_lag_interval: float = DEFAULT_LOOP_LAG_INTERVAL
+    loop_lag_threshold: float = DEFAULT_LOOP_LAG_THRESHOLD
+    trace_buffer_size: int = DEFAULT_TRACE_BUFFER_SIZE
+    profiling: bool = DEFAULT_PROFILING
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+from home_automations.const import DEFAULT_PERSISTENCE_INTERVAL
+
+
+@dataclass
+class PersistenceConfig:
+    """Configuration for persisting the module runtime state."""
+
+    path: str | None = None
+    interval: int = DEFAULT_PERSISTENCE_INTERVAL
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from home_automations.const import DEFAULT_RECORDING_INTERVAL
+
+
+@dataclass
+class RecordingConfig:
+    """Configuration for recording the incoming events for replays."""
+
+    enabled: bool = False
+    path: str | None = None
+    interval: int = DEFAULT_RECORDING_INTERVAL
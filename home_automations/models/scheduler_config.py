@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+from home_automations.const import (
+    DEFAULT_HANDLER_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_HANDLERS,
+    DEFAULT_MAX_PRIORITY_WAIT,
+)
+
+
+@dataclass
+class SchedulerConfig:
+    """Configuration for running module callbacks."""
+
+    max_concurrent_handlers: int = DEFAULT_MAX_CONCURRENT_HANDLERS
+    max_wait: float = DEFAULT_MAX_PRIORITY_WAIT
+    handler_timeout: float | None = DEFAULT_HANDLER_TIMEOUT
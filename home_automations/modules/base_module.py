@@ -1,16 +1,24 @@
 """Base module for all modules."""
 
 from abc import ABC
-from typing import Any, Callable
+from datetime import timedelta
+from typing import Any, Callable, Iterable
 
 from hass_client.models import Event, State
 
+from home_automations.const import Priority
 from home_automations.helper.clock_events import ClockEvents
+from home_automations.helper.coalescer import StateCoalescer
+from home_automations.helper.events import state_fields_changed
+from home_automations.helper.handler import Handler
 from home_automations.models.config import Config
 from home_automations.tools import Tools
 
 
 class BaseModule(ClockEvents, ABC):
+    # Default priority of the callbacks and clock events of the module.
+    priority: Priority = Priority.NORMAL
+
     def __init__(
         self,
         config: Config,
@@ -18,27 +26,94 @@ class BaseModule(ClockEvents, ABC):
     ):
         self.config: Config = config
         self.tools: Tools = tools
-        self.state_changed_events: dict[str, list[Callable]] = {}
-        self.zha_events: dict[str, list[Callable]] = {}
+        self.state_changed_events: dict[str, list[Handler]] = {}
+        self.zha_events: dict[str, list[Handler]] = {}
+        self._coalescers: dict[Handler, StateCoalescer] = {}
+
+        self._events_dispatched = self.tools.metrics.counter(
+            "events_dispatched_total",
+            "Events dispatched to module callbacks.",
+            ("event_type",),
+        )
+        self._events_filtered = self.tools.metrics.counter(
+            "events_filtered_total",
+            "State changes skipped before being dispatched to module callbacks.",
+            ("module", "reason"),
+        )
 
+        self._wrap_clock_events()
         self.tools.clock.register_module(self)
 
+    def _wrap_clock_events(self):
+        for hook in (
+            "on_day_changed",
+            "on_hour_changed",
+            "on_minute_changed",
+            "on_second_changed",
+        ):
+            if getattr(type(self), hook) is getattr(ClockEvents, hook):
+                continue
+
+            setattr(self, hook, self._create_handler(getattr(self, hook)))
+
+    def _create_handler(
+        self,
+        method_callable: Callable,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+        **options: Any,
+    ) -> Handler:
+        return Handler(
+            self,
+            method_callable,
+            self.tools.handler_stats,
+            self.tools.breakers,
+            self.tools.scheduler,
+            priority if priority is not None else self.priority,
+            timeout if timeout is not None else self.config.scheduler.handler_timeout,
+            **options,
+        )
+
     def _register_event_callback(
-        self, key: Any, method_callable: Callable, event_dict: dict[Any, list[Callable]]
-    ):
+        self,
+        key: Any,
+        method_callable: Callable,
+        event_dict: dict[Any, list[Handler]],
+        **options: Any,
+    ) -> Handler:
         if key not in event_dict:
             event_dict[key] = []
 
-        event_dict[key].append(method_callable)
+        handler = self._create_handler(method_callable, **options)
+        event_dict[key].append(handler)
+
+        return handler
 
     def _get_event_callbacks(
-        self, key: Any, event_dict: dict[Any, list[Callable]]
-    ) -> list[Callable]:
+        self, key: Any, event_dict: dict[Any, list[Handler]]
+    ) -> list[Handler]:
         if key not in event_dict:
             return []
 
         return event_dict[key]
 
+    @property
+    def name(self) -> str:
+        """Return a name identifying the module instance."""
+
+        return type(self).__name__
+
+    def snapshot(self) -> dict[str, Any] | None:
+        """Return the runtime state to persist across restarts."""
+
+        return None
+
+    def restore(self, snapshot: dict[str, Any]):
+        """Restore the runtime state from a snapshot."""
+
+    async def on_start(self):
+        """Run once on application start, in parallel to connecting."""
+
     async def on_event(self, event: Event):
         pass
 
@@ -52,11 +127,38 @@ class BaseModule(ClockEvents, ABC):
         if event.data["old_state"] is None or event.data["new_state"] is None:
             return
 
-        old_state = State(**event.data["old_state"])
-        new_state = State(**event.data["new_state"])
+        caused_by_self = event.data.get("caused_by_self", False)
+        states: tuple[State, State] | None = None
 
         for method_callable in self.state_changed_events[event.data["entity_id"]]:
-            await method_callable(event, old_state, new_state)
+            if method_callable.ignore_self:
+                # The result of the service call may arrive after its event.
+                if not caused_by_self and self.tools.client.is_own_context(event):
+                    caused_by_self = event.data["caused_by_self"] = True
+
+                if caused_by_self:
+                    self._events_filtered.inc(self.name, "self")
+                    continue
+
+            if method_callable.fields is not None and not state_fields_changed(
+                event.data["old_state"], event.data["new_state"], method_callable.fields
+            ):
+                self._events_filtered.inc(self.name, "fields")
+                continue
+
+            if method_callable in self._coalescers:
+                await self._coalescers[method_callable].push(event)
+                continue
+
+            self._events_dispatched.inc(event.event_type)
+
+            if states is None:
+                states = (
+                    State(**event.data["old_state"]),
+                    State(**event.data["new_state"]),
+                )
+
+            await method_callable(event, *states)
 
     async def on_zha_event(self, event: Event):
         if "device_ieee" not in event.data:
@@ -68,12 +170,74 @@ class BaseModule(ClockEvents, ABC):
             return
 
         for method_callable in self.zha_events[device_ieee]:
+            self._events_dispatched.inc(event.event_type)
             await method_callable(event, device_ieee)
 
-    def register_state_changed(self, method_callable: Callable, entity_id: str):
+    def register_state_changed(
+        self,
+        method_callable: Callable,
+        entity_id: str,
+        ignore_self: bool = False,
+        fields: Iterable[str] | None = None,
+        coalesce: float | None = None,
+        max_rate: float | None = None,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+    ):
+        """Call a method when the state of an entity changes.
+
+        With `ignore_self`, the changes caused by our own service calls are
+        skipped before their states are parsed. With `fields`, only changes
+        of the state (`state`) or the named attributes are passed on.
+
+        With `coalesce` seconds or a `max_rate` per second, bursts of
+        changes are merged and the method is called once with the latest
+        state, see `StateCoalescer`. `priority` overrides the priority of
+        the module and `timeout` the default timeout of callbacks.
+        """
+
+        handler = self._register_event_callback(
+            entity_id,
+            method_callable,
+            self.state_changed_events,
+            ignore_self=ignore_self,
+            fields=tuple(fields) if fields is not None else None,
+            priority=priority,
+            timeout=timeout,
+        )
+
+        if coalesce is not None or max_rate is not None:
+            self._coalescers[handler] = StateCoalescer(
+                handler,
+                self.tools.loop,
+                self._events_dispatched,
+                self._events_filtered,
+                window=coalesce or 0.0,
+                max_rate=max_rate,
+            )
+
+    def register_zha_event(
+        self,
+        method_callable: Callable,
+        device_ieee: str,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+    ):
         self._register_event_callback(
-            entity_id, method_callable, self.state_changed_events
+            device_ieee,
+            method_callable,
+            self.zha_events,
+            priority=priority,
+            timeout=timeout,
         )
 
-    def register_zha_event(self, method_callable: Callable, device_ieee: str):
-        self._register_event_callback(device_ieee, method_callable, self.zha_events)
+    def register_task(
+        self,
+        method_callable: Callable,
+        interval: timedelta,
+        priority: Priority | None = None,
+        timeout: float | None = None,
+    ):
+        self.tools.clock.register_task(
+            self._create_handler(method_callable, priority, timeout), interval
+        )
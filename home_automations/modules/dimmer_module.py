@@ -1,5 +1,6 @@
 from hass_client.models import Event
 
+from home_automations.const import Priority
 from home_automations.models.config import Config
 from home_automations.models.dimmer_config import DimmerConfig
 from home_automations.modules.base_module import BaseModule
@@ -7,6 +8,8 @@ from home_automations.tools import Tools
 
 
 class DimmerModule(BaseModule):
+    priority = Priority.HIGH
+
     dimmer_config: DimmerConfig
 
     def __init__(
@@ -21,6 +24,10 @@ class DimmerModule(BaseModule):
 
         self.register_zha_event(self.on_dimmer_event, self.dimmer_config.device_ieee)
 
+    @property
+    def name(self) -> str:
+        return f"{super().name}[{self.dimmer_config.name}]"
+
     async def on_off(self):
         pass
 
@@ -19,7 +19,7 @@ class DummyModule(BaseModule):
             self.on_dummy_state_changed, "switch.home_automations_dummy"
         )
 
-        self.tools.clock.register_task(self.switch_dummy, timedelta(seconds=5))
+        self.register_task(self.switch_dummy, timedelta(seconds=5))
 
     async def switch_dummy(self) -> None:
         await self.tools.client.call_service(
@@ -33,4 +33,4 @@ class DummyModule(BaseModule):
     async def on_dummy_state_changed(
         self, event: Event, old_state: State, new_state: State
     ) -> None:
-        self.tools.api._last_state_changed = datetime.now()
+        self.tools.api.set_last_state_changed(datetime.now())
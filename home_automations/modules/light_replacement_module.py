@@ -1,5 +1,6 @@
 from hass_client.models import Event, State
 
+from home_automations.const import Priority
 from home_automations.helper.clock_events import ClockEvents
 from home_automations.models.config import Config
 from home_automations.models.light_replacement_config import LightReplacementConfig
@@ -8,6 +9,8 @@ from home_automations.tools import Tools
 
 
 class LightReplacementModule(BaseModule, ClockEvents):
+    priority = Priority.HIGH
+
     def __init__(
         self,
         config: Config,
@@ -19,9 +22,15 @@ class LightReplacementModule(BaseModule, ClockEvents):
         self.light_replacement_config: LightReplacementConfig = light_replacement_config
 
         self.register_state_changed(
-            self.on_light_changed, light_replacement_config.light_entity
+            self.on_light_changed,
+            light_replacement_config.light_entity,
+            fields=["state"],
         )
 
+    @property
+    def name(self) -> str:
+        return f"{super().name}[{self.light_replacement_config.light_entity}]"
+
     async def on_light_changed(
         self, event: Event, old_state: State, new_state: State
     ) -> None:
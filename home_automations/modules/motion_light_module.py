@@ -3,9 +3,11 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
+from typing import Any
 
 from hass_client.models import Event, State
 
+from home_automations.const import Priority
 from home_automations.models.config import Config
 from home_automations.models.motion_light_config import MotionLightConfig
 from home_automations.modules.base_module import BaseModule
@@ -15,6 +17,8 @@ _LOGGER = logging.getLogger(__name__)
 
 
 class MotionLightModule(BaseModule):
+    priority = Priority.HIGH
+
     def __init__(
         self,
         config: Config,
@@ -40,14 +44,39 @@ class MotionLightModule(BaseModule):
         self.ignore_motion: bool = False
 
         for motion_entity in self.motion_light_config.motion_entities:
-            self.register_state_changed(self.on_motion_changed, motion_entity)
+            self.register_state_changed(
+                self.on_motion_changed, motion_entity, fields=["state"]
+            )
 
         for light_entity in self.motion_light_config.light_on_entities:
-            self.register_state_changed(self.on_light_changed, light_entity)
+            self.register_state_changed(
+                self.on_light_changed,
+                light_entity,
+                ignore_self=True,
+                fields=["state", "brightness", "color_temp", "rgb_color"],
+            )
 
         for dimmer_ieee in self.motion_light_config.dimmer_ieees:
             self.register_zha_event(self.on_dimmer_event, dimmer_ieee)
 
+    @property
+    def name(self) -> str:
+        return f"{super().name}[{self.motion_light_config.name}]"
+
+    def snapshot(self) -> dict[str, Any] | None:
+        return {
+            "last_motion": self.last_motion.isoformat(),
+            "last_changed": self.last_changed.isoformat(),
+            "manual_off_time": self.manual_off_time.isoformat(),
+            "is_manual_off": self.is_manual_off,
+        }
+
+    def restore(self, snapshot: dict[str, Any]):
+        self.last_motion = datetime.fromisoformat(snapshot["last_motion"])
+        self.last_changed = datetime.fromisoformat(snapshot["last_changed"])
+        self.manual_off_time = datetime.fromisoformat(snapshot["manual_off_time"])
+        self.is_manual_off = snapshot["is_manual_off"]
+
     @property
     async def current_scene(self) -> str:
         return await self.tools.day_state_resolver.resolve(self.motion_light_config)
@@ -68,7 +97,10 @@ class MotionLightModule(BaseModule):
 
             if state.state != "off":
                 _LOGGER.warning(
-                    f"[{self.motion_light_config.name}] Unknown state {state.state} for motion on entity {motion_on_entity}"
+                    "[%s] Unknown state %s for motion on entity %s",
+                    self.motion_light_config.name,
+                    state.state,
+                    motion_on_entity,
                 )
 
         return False
@@ -83,7 +115,10 @@ class MotionLightModule(BaseModule):
 
             if state.state != "on":
                 _LOGGER.warning(
-                    f"[{self.motion_light_config.name}] Unknown state {state.state} for motion off entity {motion_off_entity}"
+                    "[%s] Unknown state %s for motion off entity %s",
+                    self.motion_light_config.name,
+                    state.state,
+                    motion_off_entity,
                 )
 
         return False
@@ -98,7 +133,9 @@ class MotionLightModule(BaseModule):
 
             if state.state != "on":
                 _LOGGER.warning(
-                    f"Unknown state {state.state} for switch entity {switch_entity}"
+                    "Unknown state %s for switch entity %s",
+                    state.state,
+                    switch_entity,
                 )
 
         return True
@@ -155,10 +192,10 @@ class MotionLightModule(BaseModule):
                 await self.on_user_on()
 
     async def on_motion_on(self):
-        _LOGGER.debug(f"[{self.motion_light_config.name}] Motion on")
+        _LOGGER.debug("[%s] Motion on", self.motion_light_config.name)
 
         if self.current_task is not None and not self.current_task.done():
-            _LOGGER.debug(f"[{self.motion_light_config.name}] Cancelling off task")
+            _LOGGER.debug("[%s] Cancelling off task", self.motion_light_config.name)
             self.current_task.cancel()
 
         manual_off_time_difference = (
@@ -170,7 +207,8 @@ class MotionLightModule(BaseModule):
             < self.motion_light_config.off_override_time
         ):
             _LOGGER.debug(
-                f"[{self.motion_light_config.name}] Manual off override, not turning on"
+                "[%s] Manual off override, not turning on",
+                self.motion_light_config.name,
             )
             self.is_manual_off = True
             return
@@ -183,12 +221,12 @@ class MotionLightModule(BaseModule):
         #     return
 
         if not await self.all_lights_off:
-            _LOGGER.debug(f"[{self.motion_light_config.name}] Lights already on")
+            _LOGGER.debug("[%s] Lights already on", self.motion_light_config.name)
             return
 
         scene = await self.current_scene
 
-        _LOGGER.debug(f"[{self.motion_light_config.name}] Turning on scene {scene}")
+        _LOGGER.debug("[%s] Turning on scene %s", self.motion_light_config.name, scene)
 
         async def turn_on():
             await asyncio.sleep(self.motion_light_config.on_delay)
@@ -204,10 +242,10 @@ class MotionLightModule(BaseModule):
         self.last_motion = self.tools.clock.current_datetime()
 
     async def on_motion_off(self):
-        _LOGGER.debug(f"[{self.motion_light_config.name}] Motion off")
+        _LOGGER.debug("[%s] Motion off", self.motion_light_config.name)
 
         if self.current_task is not None and not self.current_task.done():
-            _LOGGER.debug(f"[{self.motion_light_config.name}] Cancelling on task")
+            _LOGGER.debug("[%s] Cancelling on task", self.motion_light_config.name)
             self.current_task.cancel()
 
         if self.is_manual_off:
@@ -221,7 +259,8 @@ class MotionLightModule(BaseModule):
 
         if time_difference.total_seconds() > 0:
             _LOGGER.debug(
-                f"[{self.motion_light_config.name}] Light changed by user, not turning off"
+                "[%s] Light changed by user, not turning off",
+                self.motion_light_config.name,
             )
             return
 
@@ -298,7 +337,11 @@ class MotionLightModule(BaseModule):
             return
 
         _LOGGER.debug(
-            f"[{self.motion_light_config.name}] Light {new_state.entity_id} changed by user from {old_state.state} to {new_state.state}"
+            "[%s] Light %s changed by user from %s to %s",
+            self.motion_light_config.name,
+            new_state.entity_id,
+            old_state.state,
+            new_state.state,
         )
 
         if old_state.state != new_state.state and new_state.state == "off":
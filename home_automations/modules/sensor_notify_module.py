@@ -1,5 +1,6 @@
 from hass_client.models import Event, State
 
+from home_automations.const import Priority
 from home_automations.models.config import Config
 from home_automations.models.sensor_notify_config import SensorNotifyConfig
 from home_automations.modules.base_module import BaseModule
@@ -7,6 +8,8 @@ from home_automations.tools import Tools
 
 
 class SensorNotifyModule(BaseModule):
+    priority = Priority.LOW
+
     def __init__(
         self,
         config: Config,
@@ -18,9 +21,15 @@ class SensorNotifyModule(BaseModule):
         self.sensor_notify_config = sensor_notify_config
 
         self.register_state_changed(
-            self.on_sensor_state_changed, sensor_notify_config.sensor_entity
+            self.on_sensor_state_changed,
+            sensor_notify_config.sensor_entity,
+            fields=["state"],
         )
 
+    @property
+    def name(self) -> str:
+        return f"{super().name}[{self.sensor_notify_config.sensor_entity}]"
+
     async def on_sensor_state_changed(
         self, event: Event, old_state: State, new_state: State
     ) -> None:
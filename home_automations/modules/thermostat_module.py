@@ -1,8 +1,9 @@
 import logging
+from typing import Any
 
 from hass_client.models import Event, State
 
-from home_automations.const import ThermostatState
+from home_automations.const import THERMOSTAT_COALESCE_WINDOW, Priority, ThermostatState
 from home_automations.helper.math import Math
 from home_automations.models.climate_config import ClimateConfig
 from home_automations.models.config import Config
@@ -14,6 +15,8 @@ from home_automations.tools import Tools
 class ThermostatModule(BaseModule):
     """Module for controlling a thermostat."""
 
+    priority = Priority.LOW
+
     def __init__(
         self,
         config: Config,
@@ -30,11 +33,35 @@ class ThermostatModule(BaseModule):
             self.register_state_changed(self.on_window_changed, window_entity)
 
         self.register_state_changed(
-            self.on_climate_changed, self.climate_config.climate_control_entity
+            self.on_climate_changed,
+            self.climate_config.climate_control_entity,
+            ignore_self=True,
+            fields=["state", "temperature"],
+            coalesce=THERMOSTAT_COALESCE_WINDOW,
         )
 
         self._last_control_state: ThermostatState | None = None
 
+    @property
+    def name(self) -> str:
+        return f"{super().name}[{self.thermostat_config.climate_entity}]"
+
+    def snapshot(self) -> dict[str, Any] | None:
+        return {
+            "last_control_state": self._last_control_state.value
+            if self._last_control_state is not None
+            else None,
+        }
+
+    def restore(self, snapshot: dict[str, Any]):
+        last_control_state = snapshot["last_control_state"]
+
+        self._last_control_state = (
+            ThermostatState(last_control_state)
+            if last_control_state is not None
+            else None
+        )
+
     @property
     async def is_window_open(self) -> bool:
         """Return whether one of the windows is open."""
@@ -199,7 +226,7 @@ class ThermostatModule(BaseModule):
         ):
             return
 
-        logging.info(f"Selecting thermostat mode {state.value}.")
+        logging.info("Selecting thermostat mode %s.", state.value)
 
         await self.tools.client.call_service(
             "climate",
@@ -222,7 +249,7 @@ class ThermostatModule(BaseModule):
         if temp == await self.current_thermostat_target_temp:
             return
 
-        logging.info(f"Setting {self.thermostat_config.climate_entity} to {temp}.")
+        logging.info("Setting %s to %s.", self.thermostat_config.climate_entity, temp)
 
         await self.tools.client.call_service(
             "climate",
@@ -293,7 +320,9 @@ class ThermostatModule(BaseModule):
             return
 
         logging.info(
-            f"Assigning new target temperature {temperature} to {self.thermostat_config.climate_entity}"
+            "Assigning new target temperature %s to %s",
+            temperature,
+            self.thermostat_config.climate_entity,
         )
 
         self.tools.clock.set_schedule(self.climate_config.schedule, temperature)
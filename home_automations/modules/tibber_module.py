@@ -1,11 +1,12 @@
 import logging
 from datetime import timedelta
+from typing import Any
 
 from aiohttp import ClientConnectorError
 from colour import Color
 from tibber import FatalHttpException, Tibber
 
-from home_automations.const import TibberLevel
+from home_automations.const import Priority, TibberLevel
 from home_automations.models.config import Config
 from home_automations.modules.base_module import BaseModule
 from home_automations.tools import Tools
@@ -14,6 +15,8 @@ from home_automations.tools import Tools
 class TibberModule(BaseModule):
     """Module for tibber related automations."""
 
+    priority = Priority.LOW
+
     tibber: Tibber
     last_level: TibberLevel = TibberLevel.UNKNOWN
 
@@ -29,7 +32,19 @@ class TibberModule(BaseModule):
             user_agent="Home Automations",
         )
 
-        self.tools.clock.register_task(self.on_update, timedelta(seconds=60))
+        self.register_task(self.on_update, timedelta(seconds=60))
+
+    def snapshot(self) -> dict[str, Any] | None:
+        return {"last_level": self.last_level.value}
+
+    def restore(self, snapshot: dict[str, Any]):
+        self.last_level = TibberLevel(snapshot["last_level"])
+
+    async def on_start(self):
+        try:
+            await self.tibber.update_info()
+        except (ClientConnectorError, FatalHttpException) as e:
+            logging.error(e)
 
     async def on_update(self):
         try:
@@ -51,6 +66,9 @@ class TibberModule(BaseModule):
             if price <= 0:
                 level = TibberLevel.FREE
 
+            if level == self.last_level:
+                return
+
             if level not in self.config.tibber.level_to_color:
                 return
 
@@ -35,6 +35,10 @@ class TimedLightModule(BaseModule, ClockEvents):
                 self.on_elevation_changed, "sensor.sonne_solar_elevation"
             )
 
+    @property
+    def name(self) -> str:
+        return f"{super().name}[{','.join(self.timed_light_config.light_entities)}]"
+
     async def on_off(self):
         if not await self.is_switch_on():
             return
@@ -73,7 +77,10 @@ class TimedLightModule(BaseModule, ClockEvents):
         self, event: Event, old_state: State, new_state: State
     ) -> None:
         logging.info(
-            f"Schedule changed: {old_state.entity_id} {old_state.state} -> {new_state.state}"
+            "Schedule changed: %s %s -> %s",
+            old_state.entity_id,
+            old_state.state,
+            new_state.state,
         )
 
         if new_state.state == old_state.state:
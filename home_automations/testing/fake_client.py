@@ -0,0 +1,71 @@
+import uuid
+from typing import Any, Callable
+
+from hass_client.models import State
+
+
+class FakeHassClient:
+    """In-process stand-in for the hass client.
+
+    Answers from a fixed set of states and records service calls instead of
+    sending them, without changing any state.
+    """
+
+    def __init__(self, states: list[dict[str, Any]] | None = None):
+        self.states: dict[str, dict[str, Any]] = {
+            state["entity_id"]: state for state in states or []
+        }
+        self.connected = False
+        self.event_callbacks: list[Callable] = []
+        self.service_calls: list[dict[str, Any]] = []
+
+    def __call__(self, websocket_url: str, token: str) -> "FakeHassClient":
+        """Return itself, so it can be used as the hass client factory."""
+
+        return self
+
+    async def connect(self):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+    async def subscribe_events(self, callback: Callable) -> Callable:
+        self.event_callbacks.append(callback)
+
+        return lambda: self.event_callbacks.remove(callback)
+
+    async def send_command(self, command: str, **kwargs: Any) -> Any:
+        if command == "get_states":
+            return list(self.states.values())
+
+        if command == "get_config":
+            return {}
+
+        raise NotImplementedError(command)
+
+    async def get_state(self, entity_id: str) -> State | None:
+        if entity_id not in self.states:
+            return None
+
+        return State(**self.states[entity_id])
+
+    async def call_service(
+        self,
+        domain: str,
+        service: str,
+        service_data: dict[str, Any] | None = None,
+        target: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        context = {"id": uuid.uuid4().hex, "parent_id": None, "user_id": None}
+
+        self.service_calls.append(
+            {
+                "domain": domain,
+                "service": service,
+                "service_data": service_data,
+                "target": target,
+            }
+        )
+
+        return {"context": context, "response": None}
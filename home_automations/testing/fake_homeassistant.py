@@ -0,0 +1,384 @@
+"""Local stand-in for the Home Assistant websocket API.
+
+Serves enough of the websocket API for the client to run against it
+without a Home Assistant instance, with configurable latency and failures.
+
+    python -m home_automations.testing.fake_homeassistant --states states.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+HA_VERSION = "2024.1.0"
+MATCH_ALL = "*"
+STATE_SERVICES = {"turn_on": "on", "turn_off": "off"}
+
+
+def create_state(
+    entity_id: str, state: str, attributes: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Create a state dict as sent by Home Assistant."""
+
+    now = datetime.now(timezone.utc).isoformat()
+
+    return {
+        "entity_id": entity_id,
+        "state": state,
+        "attributes": attributes or {},
+        "last_changed": now,
+        "last_updated": now,
+        "context": create_context(),
+    }
+
+
+def create_context(user_id: str | None = None) -> dict[str, Any]:
+    return {"id": uuid.uuid4().hex, "parent_id": None, "user_id": user_id}
+
+
+class CommandFailed(Exception):
+    """Raised by a command handler to answer with an error result."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Connection:
+    """Authenticated websocket connection of a client."""
+
+    def __init__(self, websocket: web.WebSocketResponse):
+        self.websocket = websocket
+        self.subscriptions: dict[int, str | None] = {}
+
+    async def send(self, message: dict[str, Any]):
+        if not self.websocket.closed:
+            await self.websocket.send_json(message)
+
+
+class FakeHomeAssistant:
+    """Fake Home Assistant websocket server.
+
+    Service calls to turn_on, turn_off and toggle change the state of the
+    targeted entities and broadcast state changed events, like a device
+    reporting back. Every command is answered after `latency` seconds and
+    fails with a probability of `failure_rate`. While `stalled` is set,
+    commands are not answered at all.
+    """
+
+    def __init__(
+        self,
+        states: list[dict[str, Any]] | None = None,
+        token: str = "token",
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.states: dict[str, dict[str, Any]] = {
+            state["entity_id"]: state for state in states or []
+        }
+        self.token = token
+        # Service calls are made by the user the token belongs to.
+        self.user_id = uuid.uuid4().hex
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.stalled = False
+        self.random = random.Random(seed)
+        self.connections: set[Connection] = set()
+        self.tasks: set[asyncio.Task] = set()
+        self.service_calls: list[dict[str, Any]] = []
+        self.commands_received: int = 0
+        self.events_sent: int = 0
+        self.config: dict[str, Any] = {
+            "latitude": 52.52,
+            "longitude": 13.405,
+            "elevation": 34,
+            "time_zone": "Europe/Berlin",
+            "version": HA_VERSION,
+            "state": "RUNNING",
+        }
+
+        self.app = web.Application()
+        self.app.router.add_get("/{path:.*}", self.handle_websocket)
+        self.runner: web.AppRunner | None = None
+        self.host = "127.0.0.1"
+        self.port: int | None = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/api/websocket"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """Start serving, on a free port unless one is given."""
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        self.host, self.port = sock.getsockname()
+
+        self.runner = web.AppRunner(self.app, shutdown_timeout=1.0)
+        await self.runner.setup()
+        await web.SockSite(self.runner, sock).start()
+
+    async def stop(self):
+        await self.drop_connections()
+
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self) -> "FakeHomeAssistant":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any):
+        await self.stop()
+
+    async def drop_connections(self):
+        """Close all client connections, as when Home Assistant restarts."""
+
+        for connection in list(self.connections):
+            await connection.websocket.close()
+
+    async def set_state(
+        self,
+        entity_id: str,
+        state: str,
+        attributes: dict[str, Any] | None = None,
+        context: dict[str, Any] | None = None,
+    ):
+        """Change the state of an entity and broadcast the change."""
+
+        old_state = self.states.get(entity_id)
+
+        if attributes is None:
+            attributes = old_state["attributes"] if old_state else {}
+
+        new_state = create_state(entity_id, state, attributes)
+
+        if context is not None:
+            new_state["context"] = context
+
+        if old_state is not None and old_state["state"] == state:
+            new_state["last_changed"] = old_state["last_changed"]
+
+        self.states[entity_id] = new_state
+
+        await self.fire_event(
+            "state_changed",
+            {"entity_id": entity_id, "old_state": old_state, "new_state": new_state},
+            new_state["context"],
+        )
+
+    async def fire_event(
+        self,
+        event_type: str,
+        data: dict[str, Any],
+        context: dict[str, Any] | None = None,
+    ):
+        """Send an event to all subscribed clients."""
+
+        event = {
+            "event_type": event_type,
+            "data": data,
+            "origin": "LOCAL",
+            "time_fired": datetime.now(timezone.utc).isoformat(),
+            "context": context or create_context(),
+        }
+
+        for connection in list(self.connections):
+            for subscription_id, subscribed_event_type in list(
+                connection.subscriptions.items()
+            ):
+                if subscribed_event_type not in (None, MATCH_ALL, event_type):
+                    continue
+
+                self.events_sent += 1
+                await connection.send(
+                    {"id": subscription_id, "type": "event", "event": event}
+                )
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+
+        await websocket.send_json({"type": "auth_required", "ha_version": HA_VERSION})
+        auth = await websocket.receive_json()
+
+        if auth.get("type") != "auth" or auth.get("access_token") != self.token:
+            await websocket.send_json(
+                {"type": "auth_invalid", "message": "Invalid access token"}
+            )
+            await websocket.close()
+            return websocket
+
+        await websocket.send_json({"type": "auth_ok", "ha_version": HA_VERSION})
+
+        connection = Connection(websocket)
+        self.connections.add(connection)
+
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    break
+
+                payload = json.loads(message.data)
+
+                for command in payload if isinstance(payload, list) else [payload]:
+                    task = asyncio.create_task(self.handle_command(connection, command))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+        finally:
+            self.connections.discard(connection)
+
+        return websocket
+
+    async def handle_command(self, connection: Connection, command: dict[str, Any]):
+        self.commands_received += 1
+        command_id = command.get("id")
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.stalled:
+            return
+
+        if command["type"] == "ping":
+            await connection.send({"id": command_id, "type": "pong"})
+            return
+
+        try:
+            if self.failure_rate and self.random.random() < self.failure_rate:
+                raise CommandFailed("home_assistant_error", "Injected failure")
+
+            handler = getattr(self, f"command_{command['type']}", None)
+
+            if handler is None:
+                raise CommandFailed("unknown_command", "Unknown command.")
+
+            result = await handler(connection, command)
+        except CommandFailed as ex:
+            await connection.send(
+                {
+                    "id": command_id,
+                    "type": "result",
+                    "success": False,
+                    "error": {"code": ex.code, "message": ex.message},
+                }
+            )
+            return
+
+        await connection.send(
+            {"id": command_id, "type": "result", "success": True, "result": result}
+        )
+
+    async def command_supported_features(
+        self, connection: Connection, command: dict[str, Any]
+    ):
+        return None
+
+    async def command_get_config(self, connection: Connection, command: dict[str, Any]):
+        return self.config
+
+    async def command_get_states(self, connection: Connection, command: dict[str, Any]):
+        return list(self.states.values())
+
+    async def command_get_services(
+        self, connection: Connection, command: dict[str, Any]
+    ):
+        return {}
+
+    async def command_subscribe_events(
+        self, connection: Connection, command: dict[str, Any]
+    ):
+        connection.subscriptions[command["id"]] = command.get("event_type")
+
+    async def command_unsubscribe_events(
+        self, connection: Connection, command: dict[str, Any]
+    ):
+        if connection.subscriptions.pop(command["subscription"], False) is False:
+            raise CommandFailed("not_found", "Subscription not found.")
+
+    async def command_call_service(
+        self, connection: Connection, command: dict[str, Any]
+    ):
+        domain = command["domain"]
+        service = command["service"]
+        service_data = dict(command.get("service_data") or {})
+        target = dict(command.get("target") or {})
+        context = create_context(self.user_id)
+
+        entity_ids = target.get("entity_id", service_data.pop("entity_id", []))
+
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+
+        self.service_calls.append(
+            {
+                "domain": domain,
+                "service": service,
+                "service_data": service_data,
+                "target": target,
+                "context": context,
+            }
+        )
+
+        for entity_id in entity_ids:
+            state = self.states.get(entity_id)
+
+            if service == "toggle" and state is not None:
+                new_state = "off" if state["state"] == "on" else "on"
+            elif service in STATE_SERVICES:
+                new_state = STATE_SERVICES[service]
+            else:
+                continue
+
+            attributes = {**(state["attributes"] if state else {}), **service_data}
+            await self.set_state(entity_id, new_state, attributes, context)
+
+        return {"context": context, "response": None}
+
+
+async def serve(args: argparse.Namespace):
+    states = json.loads(Path(args.states).read_text()) if args.states else []
+    fake = FakeHomeAssistant(
+        states,
+        token=args.token,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+    )
+    await fake.start(args.host, args.port)
+    logging.info("Serving a fake Home Assistant on %s", fake.url)
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--token", default="token")
+    parser.add_argument("--states", help="JSON file with a list of states")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import copy
+from pathlib import Path
+from typing import Callable
+
+from fastapi import FastAPI
+from hass_client import HomeAssistantClient as HassClient
+
+from home_automations.helper.time_source import TimeSource
+from home_automations.home_automations import HomeAutomations
+from home_automations.models.config import Config
+
+# The Tibber module calls the Tibber API, the dummy module toggles its
+# switch every few seconds to signal that the app is alive.
+DEFAULT_EXCLUDED_MODULES = ["TibberModule", "DummyModule"]
+
+
+def create_home_automations(
+    config: Config,
+    hass_client_factory: Callable[[str, str], HassClient],
+    state_directory: Path,
+    time_source: TimeSource | None = None,
+) -> HomeAutomations:
+    """Create the app around a fake client or a client of a fake server.
+
+    The modules start without persisted state and do not touch the state
+    file or the recording of the config.
+    """
+
+    config = copy.deepcopy(config)
+    config.persistence.path = str(state_directory / "state.json")
+    config.recording.enabled = False
+
+    fastapi = FastAPI()
+    fastapi.state.config = config
+
+    return HomeAutomations(
+        fastapi, hass_client_factory=hass_client_factory, time_source=time_source
+    )
+
+
+def exclude_modules(home_automations: HomeAutomations, excluded_modules: list[str]):
+    """Remove the modules of the given classes before the app starts."""
+
+    for module in list(home_automations.modules):
+        if type(module).__name__ in excluded_modules:
+            home_automations.modules.remove(module)
+            home_automations.tools.clock.unregister_module(module)
+
+
+async def connect_without_clock(home_automations: HomeAutomations):
+    """Connect the app to its client without running the clock hooks.
+
+    The clock hooks depend on the time the app runs at, which would make the
+    service calls differ between runs with the same events.
+    """
+
+    await home_automations.tools.client.connect()
+
+    if home_automations.update_task is not None:
+        home_automations.update_task.cancel()
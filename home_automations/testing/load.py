@@ -0,0 +1,531 @@
+"""Fire storms of events at the app and measure how it keeps up.
+
+The fake Home Assistant fires state changed events of power and motion
+sensors and zha events of remotes at a fixed rate. The app either runs
+in-process against the fake, or a running instance is configured with the
+url of the fake and its API is polled for the results.
+
+    python -m home_automations.testing.load --config config.yml \\
+        --rate 500 --duration 30
+    python -m home_automations.testing.load --config config.yml \\
+        --rate 500 --duration 30 --serve 8123 --api http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+import re
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from hass_client import HomeAssistantClient as HassClient
+
+from home_automations.helper.histogram import Histogram
+from home_automations.helper.tracing import Trace
+from home_automations.home_automations import HomeAutomations
+from home_automations.models.config import Config
+from home_automations.testing.fake_homeassistant import (
+    FakeHomeAssistant,
+    create_context,
+    create_state,
+)
+from home_automations.testing.harness import (
+    DEFAULT_EXCLUDED_MODULES,
+    create_home_automations,
+    exclude_modules,
+)
+
+# Events are fired in batches of this interval, sleeping between them.
+FIRE_INTERVAL = 0.01
+SAMPLE_INTERVAL = 0.5
+REMOTE_COMMANDS = ["on", "off", "press", "hold", "release"]
+INTERNAL_SPANS = {"event", "call_service"}
+
+
+@dataclass
+class Storm:
+    """Sources of the events of a storm, fired round-robin in random order."""
+
+    rate: float
+    duration: float
+    power_sensors: list[str] = field(default_factory=list)
+    motion_sensors: list[str] = field(default_factory=list)
+    remotes: list[str] = field(default_factory=list)
+    seed: int | None = None
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Config | None,
+        rate: float,
+        duration: float,
+        power_sensors: int,
+        motion_sensors: int,
+        remotes: int,
+        seed: int | None = None,
+    ) -> "Storm":
+        """Use the motion sensors and remotes of the config plus synthetic ones."""
+
+        storm = cls(
+            rate,
+            duration,
+            power_sensors=[f"sensor.storm_power_{i}" for i in range(power_sensors)],
+            motion_sensors=[
+                f"binary_sensor.storm_motion_{i}" for i in range(motion_sensors)
+            ],
+            remotes=[
+                f"00:00:00:00:00:00:{i // 256:02x}:{i % 256:02x}"
+                for i in range(remotes)
+            ],
+            seed=seed,
+        )
+
+        if config is not None:
+            for motion_light_config in config.motion_light_configs:
+                storm.motion_sensors += motion_light_config.motion_entities
+                storm.remotes += motion_light_config.dimmer_ieees
+
+            storm.remotes += [
+                dimmer_config.device_ieee for dimmer_config in config.dimmer_configs
+            ]
+
+        return storm
+
+    def initial_states(self) -> list[dict[str, Any]]:
+        return [
+            create_state(
+                entity_id, "0", {"unit_of_measurement": "W", "device_class": "power"}
+            )
+            for entity_id in self.power_sensors
+        ] + [
+            create_state(entity_id, "off", {"device_class": "motion"})
+            for entity_id in self.motion_sensors
+        ]
+
+
+class Instance(ABC):
+    """Statistics of the app under load."""
+
+    @abstractmethod
+    async def metrics(self) -> str:
+        """Return the metrics in the Prometheus text format."""
+
+    @abstractmethod
+    async def traces(self) -> list[dict[str, Any]]:
+        """Return the buffered traces."""
+
+    @abstractmethod
+    async def handlers(self) -> list[dict[str, Any]]:
+        """Return the statistics of the module callbacks."""
+
+
+class LocalInstance(Instance):
+    def __init__(self, home_automations: HomeAutomations):
+        self.home_automations = home_automations
+        self.last_trace: Trace | None = None
+
+    async def metrics(self) -> str:
+        return self.home_automations.tools.metrics.render()
+
+    async def traces(self) -> list[dict[str, Any]]:
+        # Only the traces added since the last call, the buffer is large.
+        traces = []
+
+        for trace in reversed(
+            self.home_automations.tools.client.tracer.traces.values()
+        ):
+            if trace is self.last_trace:
+                break
+
+            traces.append(trace)
+
+        if traces:
+            self.last_trace = traces[0]
+
+        return [trace.as_dict() for trace in traces]
+
+    async def handlers(self) -> list[dict[str, Any]]:
+        return self.home_automations.tools.handler_stats.as_list()
+
+
+class RemoteInstance(Instance):
+    def __init__(self, session: aiohttp.ClientSession, url: str):
+        self.session = session
+        self.url = url.rstrip("/")
+
+    async def _get(self, path: str, **params: Any) -> Any:
+        async with self.session.get(f"{self.url}{path}", params=params) as response:
+            response.raise_for_status()
+
+            if response.content_type == "application/json":
+                return await response.json()
+
+            return await response.text()
+
+    async def metrics(self) -> str:
+        return await self._get("/metrics")
+
+    async def traces(self) -> list[dict[str, Any]]:
+        return await self._get("/traces", limit=1_000_000)
+
+    async def handlers(self) -> list[dict[str, Any]]:
+        return await self._get("/handlers")
+
+
+def sum_metric(metrics: str, name: str) -> float:
+    """Return the sum of all samples of a metric in the Prometheus text format."""
+
+    pattern = re.compile(rf"^home_automations_{name}(?:{{.*}})? (\S+)$", re.MULTILINE)
+
+    return sum(float(value) for value in pattern.findall(metrics))
+
+
+def module_type(span_name: str) -> str:
+    """Return the module class of a span named `Module[instance].callback`."""
+
+    return span_name.rsplit(".", 1)[0].split("[", 1)[0]
+
+
+class LoadGenerator:
+    """Fires a storm from the fake and samples the instance meanwhile.
+
+    The backlog is the number of events sent by the fake that the instance
+    has not received yet, including the state changes caused by its own
+    service calls. Latencies are measured from firing an event to the end of
+    each module callback, using the traces of the instance. At high rates,
+    traces can drop out of the trace buffer between samples, so the
+    latencies are based on the traces that were caught.
+    """
+
+    def __init__(self, fake: FakeHomeAssistant, instance: Instance, storm: Storm):
+        self.fake = fake
+        self.instance = instance
+        self.storm = storm
+        self.random = random.Random(storm.seed)
+        self.fire_times: dict[str, float] = {}
+        self.traces: dict[str, dict[str, Any]] = {}
+        self.samples: list[dict[str, Any]] = []
+        self.events_fired = 0
+        self.start = 0.0
+        self.duration = 0.0
+
+    async def fire(self, kind: str, source: str):
+        context = create_context()
+        self.fire_times[context["id"]] = time.time()
+        self.events_fired += 1
+
+        if kind == "remote":
+            await self.fake.fire_event(
+                "zha_event",
+                {
+                    "device_ieee": source,
+                    "unique_id": f"{source}:1:0x0006",
+                    "endpoint_id": 1,
+                    "cluster_id": 6,
+                    "command": self.random.choice(REMOTE_COMMANDS),
+                    "args": [],
+                },
+                context,
+            )
+        elif kind == "motion":
+            state = self.fake.states.get(source)
+            on = state is None or state["state"] == "off"
+            await self.fake.set_state(source, "on" if on else "off", context=context)
+        else:
+            await self.fake.set_state(
+                source, str(round(self.random.uniform(0, 3000), 1)), context=context
+            )
+
+    async def run_storm(self):
+        sources = (
+            [("power", entity_id) for entity_id in self.storm.power_sensors]
+            + [("motion", entity_id) for entity_id in self.storm.motion_sensors]
+            + [("remote", device_ieee) for device_ieee in self.storm.remotes]
+        )
+        self.random.shuffle(sources)
+        total = int(self.storm.rate * self.storm.duration)
+
+        while self.events_fired < total:
+            due = min(
+                total, int((time.perf_counter() - self.start) * self.storm.rate) + 1
+            )
+
+            while self.events_fired < due:
+                await self.fire(*sources[self.events_fired % len(sources)])
+
+            await asyncio.sleep(FIRE_INTERVAL)
+
+        self.duration = time.perf_counter() - self.start
+
+    async def sample(self) -> dict[str, Any]:
+        metrics = await self.instance.metrics()
+        received = sum_metric(metrics, "events_received_total")
+
+        for trace in await self.instance.traces():
+            if trace["context_id"] in self.fire_times:
+                self.traces[trace["trace_id"]] = trace
+
+        sample = {
+            "time": time.perf_counter() - self.start,
+            "events_fired": self.events_fired,
+            "events_sent": self.fake.events_sent,
+            "events_received": received,
+            "backlog": self.fake.events_sent - received,
+            "tasks": sum_metric(metrics, "tasks"),
+        }
+        self.samples.append(sample)
+
+        return sample
+
+    async def run(self, drain_timeout: float) -> dict[str, Any]:
+        """Fire the storm, wait for the backlog to drain and return a report."""
+
+        self.start = time.perf_counter()
+        first = last = await self.sample()
+        storm_task = asyncio.create_task(self.run_storm())
+
+        while not storm_task.done():
+            await asyncio.wait({storm_task}, timeout=SAMPLE_INTERVAL)
+            last = await self.sample()
+
+        await storm_task
+        storm_duration = self.duration
+
+        drain_deadline = time.perf_counter() + drain_timeout
+        drained = last
+
+        while drained["backlog"] > 0 and time.perf_counter() < drain_deadline:
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            drained = await self.sample()
+
+        received = last["events_received"] - first["events_received"]
+
+        return {
+            "events_fired": self.events_fired,
+            "duration": storm_duration,
+            "offered_rate": self.events_fired / storm_duration,
+            "throughput": received / storm_duration,
+            "backlog": {
+                "max": max(sample["backlog"] for sample in self.samples),
+                "end": last["backlog"],
+                "growth": (last["backlog"] - first["backlog"]) / storm_duration,
+            },
+            "drain_time": drained["time"] - last["time"]
+            if drained["backlog"] <= 0
+            else None,
+            "latency": self.latencies(),
+            "samples": self.samples,
+            "handlers": await self.instance.handlers(),
+        }
+
+    def latencies(self) -> dict[str, dict[str, Any]]:
+        """Return the latency percentiles per module type, in seconds."""
+
+        latencies: dict[str, list[float]] = {}
+
+        for trace in self.traces.values():
+            fired = self.fire_times[trace["context_id"]]
+            started = datetime.fromisoformat(trace["started"]).timestamp()
+            ends: dict[str, float] = {}
+
+            for span in trace["spans"]:
+                if span["name"] in INTERNAL_SPANS or span["duration"] is None:
+                    continue
+
+                name = module_type(span["name"])
+                ends[name] = max(ends.get(name, 0.0), span["offset"] + span["duration"])
+
+            for name, end in ends.items():
+                latencies.setdefault(name, []).append(started + end - fired)
+
+        result = {}
+
+        for name, samples in sorted(latencies.items()):
+            histogram = Histogram(window=len(samples))
+
+            for sample in samples:
+                histogram.observe(max(sample, 0.0))
+
+            result[name] = histogram.as_dict()
+
+        return result
+
+
+async def run_local(
+    config: Config,
+    storm: Storm,
+    states: list[dict[str, Any]],
+    excluded_modules: list[str],
+    drain_timeout: float,
+) -> dict[str, Any]:
+    """Run the app in-process against the fake and fire a storm at it.
+
+    The fake and the app share the event loop, so firing the events takes
+    time away from handling them.
+    """
+
+    async with FakeHomeAssistant(states + storm.initial_states()) as fake:
+        config = copy.deepcopy(config)
+        config.homeassistant.url = fake.url
+        config.homeassistant.token = fake.token
+        config.monitoring.trace_buffer_size = max(
+            config.monitoring.trace_buffer_size, int(storm.rate * storm.duration)
+        )
+
+        with tempfile.TemporaryDirectory() as state_directory:
+            home_automations = create_home_automations(
+                config, HassClient, Path(state_directory)
+            )
+            exclude_modules(home_automations, excluded_modules)
+
+            await home_automations.start()
+            assert home_automations.startup_task is not None
+            await home_automations.startup_task
+
+            if not home_automations.tools.client.connected:
+                raise ConnectionError(f"Could not connect to {fake.url}")
+
+            try:
+                return await LoadGenerator(
+                    fake, LocalInstance(home_automations), storm
+                ).run(drain_timeout)
+            finally:
+                await home_automations.stop()
+
+
+async def run_remote(
+    storm: Storm,
+    states: list[dict[str, Any]],
+    host: str,
+    port: int,
+    api_url: str,
+    drain_timeout: float,
+) -> dict[str, Any]:
+    """Serve the fake for a running instance and fire a storm at it."""
+
+    fake = FakeHomeAssistant(states + storm.initial_states())
+    await fake.start(host, port)
+    logging.info("Waiting for an instance to connect to %s", fake.url)
+
+    try:
+        while not any(connection.subscriptions for connection in fake.connections):
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+        # Give the instance time to fetch the states after subscribing.
+        await asyncio.sleep(1)
+
+        async with aiohttp.ClientSession() as session:
+            return await LoadGenerator(
+                fake, RemoteInstance(session, api_url), storm
+            ).run(drain_timeout)
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=Path, help="required unless --serve is given")
+    parser.add_argument("--states", type=Path, help="JSON file with a list of states")
+    parser.add_argument("--rate", type=float, default=100, help="events per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--power-sensors", type=int, default=50)
+    parser.add_argument(
+        "--motion-sensors",
+        type=int,
+        default=0,
+        help="synthetic motion sensors in addition to the ones of the config",
+    )
+    parser.add_argument(
+        "--remotes",
+        type=int,
+        default=0,
+        help="synthetic remotes in addition to the ones of the config",
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--drain",
+        type=float,
+        default=30,
+        help="seconds to wait for the backlog after the storm",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="*",
+        default=DEFAULT_EXCLUDED_MODULES,
+        help="module classes to leave out of the in-process app",
+    )
+    parser.add_argument(
+        "--serve", type=int, metavar="PORT", help="serve the fake for a running app"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--api", default="http://localhost:8000", help="API url of the running app"
+    )
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+
+    if args.config is not None and not args.config.exists():
+        parser.error(f"Config file {args.config} does not exist")
+
+    if args.config is None and args.serve is None:
+        parser.error("--config is required to run the app in-process")
+
+    config = Config.load(args.config) if args.config else None
+    states = json.loads(args.states.read_text()) if args.states else []
+    storm = Storm.from_config(
+        config,
+        args.rate,
+        args.duration,
+        args.power_sensors,
+        args.motion_sensors,
+        args.remotes,
+        args.seed,
+    )
+
+    if not (storm.power_sensors or storm.motion_sensors or storm.remotes):
+        parser.error("The storm has no sources")
+
+    if args.serve is not None:
+        report = asyncio.run(
+            run_remote(storm, states, args.host, args.serve, args.api, args.drain)
+        )
+    else:
+        assert config is not None
+        report = asyncio.run(run_local(config, storm, states, args.exclude, args.drain))
+
+    drain_time = report["drain_time"]
+    print(
+        f"Fired {report['events_fired']} events in {report['duration']:.3f}s "
+        f"({report['offered_rate']:,.0f} events/s), "
+        f"received {report['throughput']:,.0f} events/s, "
+        f"backlog max {report['backlog']['max']:.0f}, "
+        f"growth {report['backlog']['growth']:+,.1f} events/s, "
+        + (f"drained in {drain_time:.3f}s" if drain_time is not None else "not drained")
+    )
+
+    for name, latency in report["latency"].items():
+        print(
+            f"  {name}: {latency['count']} events, "
+            f"p50 {latency['p50'] * 1000:.3f}ms, "
+            f"p90 {latency['p90'] * 1000:.3f}ms, "
+            f"p99 {latency['p99'] * 1000:.3f}ms"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
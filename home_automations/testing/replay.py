@@ -0,0 +1,255 @@
+"""Replay a recording of events against the modules of a config.
+
+The events are fed to the modules through a fake client, which records
+the service calls instead of sending them to Home Assistant.
+
+    python -m home_automations.testing.replay recording.jsonl.gz \\
+        --config config.yml --speed 0 --output replay.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+from hass_client.models import Event
+from marshmallow import ValidationError
+
+from home_automations.helper.recorder import EventRecorder
+from home_automations.helper.time_source import LoopTimeSource, VirtualEventLoop
+from home_automations.home_automations import HomeAutomations
+from home_automations.models.config import Config
+from home_automations.testing.fake_client import FakeHassClient
+from home_automations.testing.harness import (
+    connect_without_clock,
+    create_home_automations,
+)
+
+# Gap between events when replaying as fast as possible, long enough for
+# actions without a delay to complete before the next event.
+MIN_GAP = 0.001
+
+
+async def replay(
+    config: Config,
+    recording_path: Path,
+    speed: float,
+    settle: float,
+    virtual_time: bool = False,
+) -> dict[str, Any]:
+    """Replay a recording and return a report of the replay.
+
+    With a speed of 0, the events are replayed as fast as possible, one
+    after the other. Otherwise the recorded gaps are divided by the speed.
+    The throughput is measured over the time spent handling the events.
+
+    With virtual time, which requires a VirtualEventLoop, the clock starts
+    at the time of the recording and the gaps between the events and the
+    delays of the modules pass without waiting.
+    """
+
+    records = EventRecorder.read(recording_path)
+    first_record = next(records, None)
+    initial_states = (
+        first_record["states"]
+        if first_record is not None and first_record["type"] == "states"
+        else []
+    )
+
+    fake_client = FakeHassClient(initial_states)
+    time_source = (
+        LoopTimeSource(datetime.fromtimestamp(first_record["time"], timezone.utc))
+        if virtual_time and first_record is not None
+        else None
+    )
+
+    with tempfile.TemporaryDirectory() as state_directory:
+        return await _replay(
+            create_home_automations(
+                config, fake_client, Path(state_directory), time_source
+            ),
+            fake_client,
+            itertools.chain([first_record], records) if first_record else [],
+            speed,
+            settle,
+        )
+
+
+async def _replay(
+    home_automations: HomeAutomations,
+    fake_client: FakeHassClient,
+    records: Iterable[dict[str, Any]],
+    speed: float,
+    settle: float,
+) -> dict[str, Any]:
+    client = home_automations.tools.client
+
+    async def on_event(event: Event):
+        await home_automations.handle_exception_in_func(
+            home_automations.on_event, event
+        )
+
+    client.subscribe_events(on_event)
+    await connect_without_clock(home_automations)
+
+    service_calls: list[dict[str, Any]] = []
+    events = 0
+    busy = 0.0
+    first_time: float | None = None
+    loop = asyncio.get_running_loop()
+    loop_start = loop.time()
+    start = time.perf_counter()
+
+    def collect_service_calls():
+        for service_call in fake_client.service_calls[len(service_calls) :]:
+            service_calls.append({"event": events, **service_call})
+
+    for record in records:
+        if record["type"] == "states":
+            fake_client.states = {
+                state["entity_id"]: state for state in record["states"]
+            }
+            client.states = dict(fake_client.states)
+            continue
+
+        if first_time is None:
+            first_time = record["time"]
+
+        if speed > 0:
+            delay = (record["time"] - first_time) / speed - (loop.time() - loop_start)
+        else:
+            delay = MIN_GAP
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        collect_service_calls()
+
+        events += 1
+        event_start = time.perf_counter()
+        await client.on_event(Event(**record["event"]))
+        busy += time.perf_counter() - event_start
+
+    duration = time.perf_counter() - start
+
+    await asyncio.sleep(max(settle, MIN_GAP))
+    collect_service_calls()
+
+    await client.disconnect()
+
+    return {
+        "events": events,
+        "duration": duration,
+        "busy": busy,
+        "throughput": events / busy if busy else None,
+        "service_calls": service_calls,
+        "handlers": home_automations.tools.handler_stats.as_list(),
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> bool:
+    """Print the differences to a baseline report, return whether they match."""
+
+    if report["throughput"] and baseline["throughput"]:
+        change = report["throughput"] / baseline["throughput"] - 1
+        print(f"Throughput: {change:+.1%} compared to the baseline")
+
+    for index, (service_call, baseline_service_call) in enumerate(
+        zip(report["service_calls"], baseline["service_calls"])
+    ):
+        if service_call != baseline_service_call:
+            print(f"Service call {index} differs:")
+            print(f"  baseline: {json.dumps(baseline_service_call)}")
+            print(f"  replay:   {json.dumps(service_call)}")
+            return False
+
+    if len(report["service_calls"]) != len(baseline["service_calls"]):
+        print(
+            f"{len(report['service_calls'])} service calls, "
+            f"{len(baseline['service_calls'])} in the baseline"
+        )
+        return False
+
+    print("Service calls match the baseline")
+
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--config", type=Path, required=True)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="1 replays in real time, 0 as fast as possible",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=0,
+        help="seconds to wait for delayed actions after the last event",
+    )
+    parser.add_argument(
+        "--virtual-time",
+        action="store_true",
+        help="let gaps and delays pass without waiting",
+    )
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare to a previous report")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+
+    if not args.config.exists():
+        parser.error(f"Config file {args.config} does not exist")
+
+    try:
+        config = Config.load(args.config)
+    except ValidationError as ex:
+        parser.error(f"Config file {args.config} is invalid: {ex}")
+
+    if config is None:
+        parser.error(f"Config could not be loaded from {args.config}")
+
+    loop = VirtualEventLoop() if args.virtual_time else asyncio.new_event_loop()
+
+    try:
+        report = loop.run_until_complete(
+            replay(config, args.recording, args.speed, args.settle, args.virtual_time)
+        )
+    finally:
+        loop.close()
+
+    print(
+        f"Replayed {report['events']} events in {report['duration']:.3f}s, "
+        f"{report['busy']:.3f}s handling them "
+        f"({report['throughput'] or 0:,.0f} events/s), "
+        f"{len(report['service_calls'])} service calls"
+    )
+
+    for handler in report["handlers"][:10]:
+        print(
+            f"  {handler['module']}.{handler['callback']}: "
+            f"{handler['count']} calls, mean {handler['mean'] * 1000:.3f}ms, "
+            f"p99 {handler['p99'] * 1000:.3f}ms"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+
+    if args.baseline and not compare(report, json.loads(args.baseline.read_text())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
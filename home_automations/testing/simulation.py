@@ -0,0 +1,162 @@
+"""Simulate the modules of a config over a period of virtual time.
+
+The clock, schedules and delays follow a virtual event loop time, so a
+simulated day runs in seconds. The service calls are recorded by a fake
+client instead of being sent to Home Assistant.
+
+    python -m home_automations.testing.simulation --config config.yml \\
+        --states states.json --start 2024-01-01T00:00:00 --hours 24
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytz
+from marshmallow import ValidationError
+
+from home_automations.helper.time_source import LoopTimeSource, VirtualEventLoop
+from home_automations.home_automations import HomeAutomations
+from home_automations.models.config import Config
+from home_automations.testing.fake_client import FakeHassClient
+from home_automations.testing.harness import (
+    DEFAULT_EXCLUDED_MODULES,
+    create_home_automations,
+    exclude_modules,
+)
+
+
+async def simulate(
+    config: Config,
+    states: list[dict[str, Any]],
+    start: datetime,
+    duration: timedelta,
+    excluded_modules: list[str],
+) -> dict[str, Any]:
+    """Run the modules for a duration of virtual time, return a report."""
+
+    fake_client = FakeHassClient(states)
+
+    with tempfile.TemporaryDirectory() as state_directory:
+        return await _simulate(
+            create_home_automations(
+                config, fake_client, Path(state_directory), LoopTimeSource(start)
+            ),
+            fake_client,
+            duration,
+            excluded_modules,
+        )
+
+
+async def _simulate(
+    home_automations: HomeAutomations,
+    fake_client: FakeHassClient,
+    duration: timedelta,
+    excluded_modules: list[str],
+) -> dict[str, Any]:
+    clock = home_automations.tools.clock
+    start = clock.current_datetime()
+
+    exclude_modules(home_automations, excluded_modules)
+
+    service_calls: list[dict[str, Any]] = []
+
+    def collect_service_calls():
+        now = clock.current_datetime().isoformat()
+
+        for service_call in fake_client.service_calls[len(service_calls) :]:
+            service_calls.append({"time": now, **service_call})
+
+    real_start = time.perf_counter()
+
+    await home_automations.tools.client.connect()
+
+    end = home_automations.loop.time() + duration.total_seconds()
+
+    while home_automations.loop.time() < end:
+        await asyncio.sleep(1)
+        collect_service_calls()
+
+    real_duration = time.perf_counter() - real_start
+
+    await home_automations.stop()
+
+    return {
+        "start": start.isoformat(),
+        "end": clock.current_datetime().isoformat(),
+        "duration": real_duration,
+        "service_calls": service_calls,
+        "handlers": home_automations.tools.handler_stats.as_list(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=Path, required=True)
+    parser.add_argument("--states", type=Path, help="JSON file with a list of states")
+    parser.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        help="start time in the config's time zone, defaults to today 00:00",
+    )
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument(
+        "--exclude",
+        nargs="*",
+        default=DEFAULT_EXCLUDED_MODULES,
+        help="module classes to leave out",
+    )
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+
+    if not args.config.exists():
+        parser.error(f"Config file {args.config} does not exist")
+
+    try:
+        config = Config.load(args.config)
+    except ValidationError as ex:
+        parser.error(f"Config file {args.config} is invalid: {ex}")
+
+    if config is None:
+        parser.error(f"Config could not be loaded from {args.config}")
+
+    tz = pytz.timezone(config.timezone)
+    start = args.start or datetime.combine(datetime.now(tz).date(), datetime.min.time())
+    start = tz.localize(start) if start.tzinfo is None else start
+    states = json.loads(args.states.read_text()) if args.states else []
+
+    loop = VirtualEventLoop()
+
+    try:
+        report = loop.run_until_complete(
+            simulate(config, states, start, timedelta(hours=args.hours), args.exclude)
+        )
+    finally:
+        loop.close()
+
+    print(
+        f"Simulated {report['start']} to {report['end']} in "
+        f"{report['duration']:.3f}s, {len(report['service_calls'])} service calls"
+    )
+
+    for handler in report["handlers"][:10]:
+        print(
+            f"  {handler['module']}.{handler['callback']}: "
+            f"{handler['count']} calls, mean {handler['mean'] * 1000:.3f}ms"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import asyncio
 from dataclasses import dataclass
 
+from home_automations.helper.circuit_breaker import CircuitBreakers
 from home_automations.helper.client import HomeAssistantClient
 from home_automations.helper.clock import Clock
 from home_automations.helper.day_state import DayStateResolver
+from home_automations.helper.handler import HandlerStats
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.scheduler import HandlerScheduler
 from home_automations.home_automations_api import HomeAutomationsApi
 
 
@@ -14,3 +18,7 @@ class Tools:
     client: HomeAssistantClient
     api: HomeAutomationsApi
     day_state_resolver: DayStateResolver
+    metrics: Metrics
+    handler_stats: HandlerStats
+    breakers: CircuitBreakers
+    scheduler: HandlerScheduler
@@ -0,0 +1,216 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import pytest
+from hass_client import HomeAssistantClient as HassClient
+from hass_client.models import Event
+
+from home_automations.const import SERVICE_BREAKER_MIN_CALLS
+from home_automations.helper.circuit_breaker import BreakerState
+from home_automations.home_automations import HomeAutomations
+from home_automations.models.config import Config
+from home_automations.models.exceptions import RequestTimeoutError
+from home_automations.models.homeassistant_config import HomeAssistantConfig
+from home_automations.models.tibber_config import TibberConfig
+from home_automations.testing.fake_homeassistant import (
+    FakeHomeAssistant,
+    create_context,
+    create_state,
+)
+from home_automations.testing.harness import (
+    DEFAULT_EXCLUDED_MODULES,
+    create_home_automations,
+    exclude_modules,
+)
+
+STATES = [
+    create_state("light.hall", "off"),
+    create_state("light.kitchen", "off"),
+    create_state("sensor.temperature", "20.0", {"unit_of_measurement": "°C"}),
+]
+
+
+def create_config(url: str) -> Config:
+    config = Config(
+        timezone="Europe/Berlin",
+        homeassistant=HomeAssistantConfig(
+            url=url,
+            token="token",
+            reconnect_min_delay=0.05,
+            reconnect_max_delay=0.1,
+            service_call_timeout=0.1,
+            service_breaker_min_cooldown=0.2,
+            service_breaker_max_cooldown=0.2,
+        ),
+        tibber=TibberConfig(token="token", home_id="home_id"),
+    )
+    config.config_file_path = Path("config.yml")
+
+    return config
+
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 5.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def run_against_fake(
+    tmp_path: Path,
+    test: Callable[[FakeHomeAssistant, HomeAutomations, list[Event]], Awaitable[Any]],
+):
+    """Run the app connected to a fake Home Assistant and pass both to `test`.
+
+    The state changed events the app receives are collected in a list.
+    """
+
+    async def run():
+        async with FakeHomeAssistant(STATES) as fake:
+            home_automations = create_home_automations(
+                create_config(fake.url), HassClient, tmp_path
+            )
+            exclude_modules(home_automations, DEFAULT_EXCLUDED_MODULES)
+
+            events: list[Event] = []
+
+            async def on_event(event: Event):
+                if event.event_type == "state_changed":
+                    events.append(event)
+
+            home_automations.tools.client.subscribe_events(on_event)
+
+            await home_automations.start()
+            assert home_automations.startup_task is not None
+            await home_automations.startup_task
+
+            try:
+                await test(fake, home_automations, events)
+            finally:
+                await home_automations.stop()
+
+    asyncio.run(run())
+
+
+def test_handshake(tmp_path: Path):
+    async def test(
+        fake: FakeHomeAssistant, home_automations: HomeAutomations, events: list
+    ):
+        client = home_automations.tools.client
+
+        assert client.connected
+        assert home_automations.startup.is_ready
+        assert client.states.keys() == fake.states.keys()
+        assert (await client.get_state("light.hall")).state == "off"
+
+        await fake.set_state("light.hall", "on", context=create_context("user"))
+        await wait_for(lambda: client.states["light.hall"]["state"] == "on")
+
+        assert [event.data["entity_id"] for event in events] == ["light.hall"]
+        assert not events[0].data.get("synthetic")
+
+    run_against_fake(tmp_path, test)
+
+
+def test_resync_after_disconnect(tmp_path: Path):
+    async def test(
+        fake: FakeHomeAssistant, home_automations: HomeAutomations, events: list
+    ):
+        client = home_automations.tools.client
+        old_client = client.client
+
+        await fake.drop_connections()
+        await fake.set_state("light.kitchen", "on", context=create_context("user"))
+        await fake.set_state("sensor.temperature", "21.5")
+
+        await wait_for(lambda: client.client is not old_client and client.connected)
+        await wait_for(lambda: len(events) == 2)
+
+        assert {
+            event.data["entity_id"]: event.data["synthetic"] for event in events
+        } == {
+            "light.kitchen": True,
+            "sensor.temperature": True,
+        }
+        assert client.states["light.kitchen"]["state"] == "on"
+        assert client.states["sensor.temperature"]["state"] == "21.5"
+
+    run_against_fake(tmp_path, test)
+
+
+def test_replay_deferred_service_calls(tmp_path: Path):
+    async def test(
+        fake: FakeHomeAssistant, home_automations: HomeAutomations, events: list
+    ):
+        client = home_automations.tools.client
+
+        fake.stalled = True
+
+        for _ in range(SERVICE_BREAKER_MIN_CALLS):
+            with pytest.raises(RequestTimeoutError):
+                await client.call_service(
+                    "light", "turn_on", target={"entity_id": "light.kitchen"}
+                )
+
+        assert client.service_breaker.state == BreakerState.OPEN
+
+        await client.call_service(
+            "light", "turn_on", target={"entity_id": "light.hall"}
+        )
+        await client.call_service(
+            "light", "turn_on", {"brightness": 10}, target={"entity_id": "light.hall"}
+        )
+
+        assert list(client.deferred_service_calls) == [("light.hall", "state")]
+        assert fake.service_calls == []
+
+        fake.stalled = False
+        await asyncio.sleep(0.3)
+
+        await client.call_service(
+            "light", "turn_off", target={"entity_id": "light.kitchen"}
+        )
+        await wait_for(lambda: fake.states["light.hall"]["state"] == "on")
+
+        assert not client.deferred_service_calls
+        assert [
+            (call["service"], call["target"], call["service_data"])
+            for call in fake.service_calls
+        ] == [
+            ("turn_off", {"entity_id": "light.kitchen"}, {}),
+            ("turn_on", {"entity_id": "light.hall"}, {"brightness": 10}),
+        ]
+
+    run_against_fake(tmp_path, test)
+
+
+def test_retry_when_connection_lost_during_resync(tmp_path: Path):
+    async def test(
+        fake: FakeHomeAssistant, home_automations: HomeAutomations, events: list
+    ):
+        client = home_automations.tools.client
+        command_get_states = fake.command_get_states
+        get_states_calls = 0
+
+        async def drop_first_get_states(connection, command):
+            nonlocal get_states_calls
+            get_states_calls += 1
+
+            if get_states_calls == 1:
+                await fake.drop_connections()
+
+            return await command_get_states(connection, command)
+
+        fake.command_get_states = drop_first_get_states  # type: ignore[method-assign]
+
+        await fake.drop_connections()
+        await fake.set_state("light.kitchen", "on", context=create_context("user"))
+
+        await wait_for(lambda: get_states_calls == 2 and client.connected)
+        await wait_for(lambda: len(events) == 1)
+
+        assert events[0].data["entity_id"] == "light.kitchen"
+        assert events[0].data["synthetic"]
+        assert not client.reconnect_manager.is_reconnecting
+
+    run_against_fake(tmp_path, test)
@@ -0,0 +1,183 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+
+from home_automations.helper.circuit_breaker import BreakerState, CircuitBreakers
+from home_automations.helper.handler import Handler, HandlerStats
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.scheduler import HandlerScheduler
+from home_automations.models.breaker_config import BreakerConfig
+from home_automations.models.exceptions import HandlerTimeoutError
+from home_automations.models.scheduler_config import SchedulerConfig
+
+COOLDOWN = 10.0
+
+
+class Module:
+    name = "module"
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def cancelling() -> int:
+    task = asyncio.current_task()
+    assert task is not None
+
+    return task.cancelling()
+
+
+def create_handler(
+    callback: Callable,
+    exceptions: list[Exception],
+    clock: Clock | None = None,
+    timeout: float | None = None,
+) -> Handler:
+    metrics = Metrics()
+
+    return Handler(
+        Module(),
+        callback,
+        HandlerStats(metrics, slow_threshold=1.0),
+        CircuitBreakers(
+            BreakerConfig(
+                failure_threshold=1, min_cooldown=COOLDOWN, max_cooldown=COOLDOWN
+            ),
+            metrics,
+            exceptions.append,
+            clock or Clock(),
+        ),
+        HandlerScheduler(SchedulerConfig(), metrics),
+        timeout=timeout,
+    )
+
+
+def test_trial_is_released_when_cancelled():
+    async def run():
+        clock = Clock()
+        exceptions: list[Exception] = []
+        started = asyncio.Event()
+        fail = True
+
+        async def callback() -> Any:
+            if fail:
+                raise ValueError("broken")
+
+            started.set()
+            await asyncio.sleep(10)
+
+        handler = create_handler(callback, exceptions, clock)
+
+        assert await handler() is None
+        assert handler.breaker.state == BreakerState.OPEN
+
+        clock.time += COOLDOWN
+        fail = False
+        task = asyncio.create_task(handler())
+        await started.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert handler.breaker.state == BreakerState.HALF_OPEN
+        assert handler.breaker.allow()
+
+    asyncio.run(run())
+
+
+def test_timeout_cancels_callback():
+    async def run():
+        exceptions: list[Exception] = []
+
+        async def callback() -> Any:
+            await asyncio.sleep(10)
+
+        handler = create_handler(callback, exceptions, timeout=0.05)
+
+        async with asyncio.timeout(1):
+            assert await handler() is None
+
+        assert [type(exception) for exception in exceptions] == [HandlerTimeoutError]
+        assert handler.stats.timeouts.values == {("module", "callback"): 1}
+        assert handler.breaker.state == BreakerState.OPEN
+        assert cancelling() == 0
+
+    asyncio.run(run())
+
+
+def test_timeout_ignored_by_callback():
+    async def run():
+        exceptions: list[Exception] = []
+
+        async def callback() -> Any:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                pass
+
+            return "result"
+
+        handler = create_handler(callback, exceptions, timeout=0.05)
+
+        assert await handler() == "result"
+        assert handler.stats.timeouts.values == {("module", "callback"): 1}
+
+        # No cancel is left over for the caller.
+        await asyncio.sleep(0)
+        assert cancelling() == 0
+
+    asyncio.run(run())
+
+
+def test_cancel_from_outside_propagates():
+    async def run():
+        exceptions: list[Exception] = []
+        started = asyncio.Event()
+
+        async def callback() -> Any:
+            started.set()
+            await asyncio.sleep(10)
+
+        handler = create_handler(callback, exceptions, timeout=10)
+        task = asyncio.create_task(handler())
+        await started.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not exceptions
+        assert not handler.stats.timeouts.values
+        assert not handler.scheduler.deadlines
+
+    asyncio.run(run())
+
+
+def test_cancel_from_outside_after_timeout_propagates():
+    async def run():
+        exceptions: list[Exception] = []
+        timed_out = asyncio.Event()
+
+        async def callback() -> Any:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                timed_out.set()
+                await asyncio.sleep(10)
+
+        handler = create_handler(callback, exceptions, timeout=0.05)
+        task = asyncio.create_task(handler())
+        await timed_out.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
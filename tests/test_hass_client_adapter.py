@@ -0,0 +1,89 @@
+import asyncio
+from typing import Awaitable, Callable
+
+import aiohttp
+from hass_client import HomeAssistantClient as HassClient
+
+from home_automations.helper import hass_client_adapter
+from home_automations.testing.fake_homeassistant import FakeHomeAssistant, create_state
+
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 5.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def run_against_fake(test: Callable[[FakeHomeAssistant], Awaitable[None]]):
+    async def run():
+        async with FakeHomeAssistant([create_state("light.hall", "off")]) as fake:
+            await test(fake)
+
+    asyncio.run(run())
+
+
+def test_on_connection_lost_replaces_reconnect():
+    async def test(fake: FakeHomeAssistant):
+        client = HassClient(fake.url, fake.token)
+        lost: list[bool] = []
+        hass_client_adapter.on_connection_lost(client, lambda: lost.append(True))
+
+        await client.connect()
+        await fake.drop_connections()
+        await wait_for(lambda: bool(lost))
+        await asyncio.sleep(0.1)
+
+        assert not client.connected
+        assert not fake.connections
+        assert lost == [True]
+
+        await hass_client_adapter.close(client)
+
+    run_against_fake(test)
+
+
+def test_on_connection_lost_not_called_on_disconnect():
+    async def test(fake: FakeHomeAssistant):
+        client = HassClient(fake.url, fake.token)
+        lost: list[bool] = []
+        hass_client_adapter.on_connection_lost(client, lambda: lost.append(True))
+
+        await client.connect()
+        await hass_client_adapter.close(client)
+        await asyncio.sleep(0.1)
+
+        assert not client.connected
+        assert not lost
+
+    run_against_fake(test)
+
+
+def test_close_after_connection_lost_closes_session():
+    async def test(fake: FakeHomeAssistant):
+        client = HassClient(fake.url, fake.token)
+        hass_client_adapter.on_connection_lost(client, lambda: None)
+
+        await client.connect()
+        session = client._http_session
+        await fake.drop_connections()
+        await wait_for(lambda: not client.connected)
+
+        await hass_client_adapter.close(client)
+
+        assert session is not None and session.closed
+
+    run_against_fake(test)
+
+
+def test_close_keeps_provided_session():
+    async def test(fake: FakeHomeAssistant):
+        async with aiohttp.ClientSession() as session:
+            client = HassClient(fake.url, fake.token, session)
+
+            await client.connect()
+            await hass_client_adapter.close(client)
+
+            assert not client.connected
+            assert not session.closed
+
+    run_against_fake(test)
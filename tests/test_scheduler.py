@@ -0,0 +1,114 @@
+import asyncio
+
+from home_automations.const import Priority
+from home_automations.helper.metrics import Metrics
+from home_automations.helper.scheduler import HandlerScheduler
+from home_automations.models.scheduler_config import SchedulerConfig
+
+MAX_WAIT = 5.0
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def create_scheduler(clock: Clock) -> HandlerScheduler:
+    return HandlerScheduler(
+        SchedulerConfig(max_concurrent_handlers=1, max_wait=MAX_WAIT),
+        Metrics(),
+        clock,
+    )
+
+
+def test_waiting_callbacks_run_by_priority():
+    async def run():
+        scheduler = create_scheduler(Clock())
+        order: list[Priority] = []
+
+        async def acquire(priority: Priority):
+            await scheduler.acquire(priority)
+            order.append(priority)
+
+        assert scheduler.try_acquire(Priority.NORMAL)
+
+        tasks = [
+            asyncio.create_task(acquire(priority))
+            for priority in (Priority.LOW, Priority.NORMAL, Priority.HIGH)
+        ]
+        await asyncio.sleep(0)
+
+        assert scheduler.queued == 3
+
+        for _ in tasks:
+            scheduler.release()
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*tasks)
+
+        assert order == [Priority.HIGH, Priority.NORMAL, Priority.LOW]
+
+    asyncio.run(run())
+
+
+def test_low_priority_runs_under_high_priority_load():
+    async def run():
+        clock = Clock()
+        scheduler = create_scheduler(clock)
+        order: list[Priority] = []
+
+        async def acquire(priority: Priority):
+            await scheduler.acquire(priority)
+            order.append(priority)
+
+        assert scheduler.try_acquire(Priority.HIGH)
+
+        low = asyncio.create_task(acquire(Priority.LOW))
+        tasks = [low]
+
+        # Every time a slot is freed, another high priority callback waits.
+        while not low.done():
+            tasks.append(asyncio.create_task(acquire(Priority.HIGH)))
+            await asyncio.sleep(0)
+
+            clock.time += 1.0
+            scheduler.release()
+            await asyncio.sleep(0)
+
+            assert clock.time <= MAX_WAIT + 1.0
+
+        assert order[-1] == Priority.LOW
+        assert Priority.HIGH in order
+        assert scheduler.promotions.values == {("low",): 1}
+
+        while scheduler.queued:
+            scheduler.release()
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def run():
+        scheduler = create_scheduler(Clock())
+
+        assert scheduler.try_acquire(Priority.NORMAL)
+
+        waiter = asyncio.create_task(scheduler.acquire(Priority.HIGH))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert scheduler.queued == 0
+
+        scheduler.release()
+
+        assert scheduler.running == 0
+        assert scheduler.try_acquire(Priority.LOW)
+
+    asyncio.run(run())